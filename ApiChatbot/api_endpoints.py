@@ -3,13 +3,18 @@ FastAPI REST API for Chatbot Communication.
 This API exposes the chatbot functionality as RESTful endpoints.
 """
 
+import json
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 
 # Import chatbot function
-from utils import get_chat_response
+from utils import get_chat_response, stream_chat_response
+from tool_client import tool_api
+from intent_rules import intent_classifier
 
 # Create FastAPI app
 app = FastAPI(
@@ -38,6 +43,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Open the shared Tool API connection pool once for the whole process
+@app.on_event("startup")
+async def start_tool_client():
+    """Create the pooled Tool API session on the app's event loop."""
+    await tool_api.start()
+    # Region names for the intent fast path; loaded on first use if the Tool API is not up yet
+    await intent_classifier.load()
+
+@app.on_event("shutdown")
+async def close_tool_client():
+    """Close the pooled Tool API session and its keep-alive connections."""
+    await tool_api.close()
+
 # Request/Response Models
 class ChatRequest(BaseModel):
     message: str
@@ -71,7 +89,7 @@ async def chat(request: ChatRequest):
     """Chat with the agricultural chatbot."""
     try:
         print(f"Received chat request: {request.message}")
-        response = get_chat_response(request.message)
+        response = await get_chat_response(request.message)
         print(f"Generated response: {response[:100]}...")
         return ApiResponse(
             success=True,
@@ -87,7 +105,7 @@ async def chat(request: ChatRequest):
 async def chat_get(message: str):
     """Chat with the agricultural chatbot using GET request."""
     try:
-        response = get_chat_response(message)
+        response = await get_chat_response(message)
         return ApiResponse(
             success=True,
             data={"response": response},
@@ -96,6 +114,43 @@ async def chat_get(message: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Server-sent events: progress events and model tokens as they are produced
+async def chat_events_stream(message: str):
+    """Format the chat stream as SSE frames."""
+    try:
+        async for event, data in stream_chat_response(message):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    except Exception as e:
+        print(f"Error in chat stream: {str(e)}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+def chat_stream_response(message: str) -> StreamingResponse:
+    return StreamingResponse(
+        chat_events_stream(message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat with the agricultural chatbot, streaming the answer as server-sent events."""
+    return chat_stream_response(request.message)
+
+@app.get("/api/chat/stream")
+async def chat_stream_get(message: str):
+    """Chat with the agricultural chatbot using GET (EventSource), streaming the answer."""
+    return chat_stream_response(message)
+
+# Intent Fast Path Endpoint
+@app.get("/api/intent", response_model=ApiResponse)
+async def intent_status():
+    """Report how many messages the rule-based intent fast path answered without the LLM."""
+    return ApiResponse(
+        success=True,
+        data=intent_classifier.stats(),
+        message="Intent fast path status retrieved successfully"
+    )
+
 # List available endpoints
 @app.get("/api/endpoints", response_model=Dict[str, List[Dict[str, str]]])
 async def list_endpoints():
@@ -104,7 +159,10 @@ async def list_endpoints():
         {"method": "GET", "path": "/", "description": "Root endpoint with API information"},
         {"method": "GET", "path": "/health", "description": "Health check endpoint"},
         {"method": "POST", "path": "/api/chat", "description": "Chat with the agricultural chatbot"},
-        {"method": "GET", "path": "/api/chat?message=your_message", "description": "Chat with the agricultural chatbot using GET"}
+        {"method": "GET", "path": "/api/chat?message=your_message", "description": "Chat with the agricultural chatbot using GET"},
+        {"method": "POST", "path": "/api/chat/stream", "description": "Chat with the agricultural chatbot, streamed as server-sent events"},
+        {"method": "GET", "path": "/api/chat/stream?message=your_message", "description": "Streamed chat using GET (EventSource)"},
+        {"method": "GET", "path": "/api/intent", "description": "Intent fast path hit-rate statistics"}
     ]
     
     return {"endpoints": endpoints}
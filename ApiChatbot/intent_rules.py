@@ -0,0 +1,279 @@
+"""
+Rule-based intent fast path.
+Formulaic messages such as "jelaskan chart 3" or "data panen Jawa Barat" are parsed
+with regular expressions, the region names of the Tool API and Indonesian month names.
+Each parse gets a confidence score; below the threshold the caller falls back to the
+LLM intent agent.
+"""
+
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from tool_client import tool_api
+
+# Minimum confidence for skipping the LLM intent agent
+INTENT_FAST_PATH_THRESHOLD = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.8"))
+# Seconds to skip the fast path after the region names failed to load
+INTENT_REGIONS_RETRY = float(os.getenv("INTENT_REGIONS_RETRY", "60"))
+
+BULAN = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
+MONTHS = {
+    **{name.lower(): name for name in BULAN},
+    **{name[:3].lower(): name for name in BULAN},
+    "agt": "Agustus", "okto": "Oktober", "nop": "November", "nopember": "November",
+}
+
+CHART_PATTERN = re.compile(r"\b(?:chart|grafik|diagram|bagan)\s*(?:ke\s*-?\s*|nomor\s*|no\.?\s*|#)?([1-5])\b")
+DATA_PANEN_PATTERN = re.compile(r"\b(?:data\s+)?panen(?:\s+padi)?\b")
+YEAR_PATTERN = re.compile(r"\b(20\d{2})\b")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words asking for an explanation or summary of a chart or of the harvest data
+EXPLAIN_WORDS = {
+    "jelaskan", "jelasin", "terangkan", "uraikan", "analisis", "analisa", "analisakan",
+    "ringkas", "ringkaskan", "ringkasan", "rangkum", "rangkuman", "simpulkan", "kesimpulan",
+    "penjelasan",
+}
+# Questions and comparisons need the LLM to decide between a summary and a short answer
+QUESTION_WORDS = {
+    "berapa", "kenapa", "mengapa", "bagaimana", "gimana", "apakah", "apa", "siapa",
+    "kapan", "dimana", "mana", "bandingkan", "dibandingkan", "versus", "vs",
+}
+# Words that introduce a region; one that is not followed by a known region lowers confidence
+LOCATION_CUES = {
+    "di", "provinsi", "prov", "kabupaten", "kab", "kota", "kecamatan", "kec",
+    "desa", "kelurahan", "wilayah", "daerah",
+}
+# Words that carry no intent of their own
+FILLER_WORDS = {
+    "tolong", "mohon", "dong", "ya", "saya", "aku", "mau", "ingin", "minta", "coba",
+    "tampilkan", "lihat", "lihatkan", "tunjukkan", "berikan", "kasih", "buatkan",
+    "di", "untuk", "pada", "dan", "dari", "yang", "tentang", "mengenai", "soal",
+    "bulan", "tahun", "wilayah", "daerah", "provinsi", "prov", "kabupaten", "kab", "kota",
+    "data", "nasional", "indonesia", "seluruh", "ini", "itu", "nomor", "no", "ke",
+}
+NATIONAL_WORDS = {"nasional", "indonesia", "seluruh"}
+# Exclusions and relative dates change the meaning in ways the rules cannot express
+NEGATION_WORDS = {"kecuali", "selain", "bukan", "tanpa", "jangan", "tidak", "tak"}
+RELATIVE_TIME_WORDS = {"lalu", "kemarin", "sebelumnya", "sebelum", "depan", "terakhir"}
+REGION_PREFIXES = {"provinsi", "prov", "kabupaten", "kab", "kota"}
+# Each word the rules cannot account for may be a place or condition they would drop
+UNKNOWN_WORD_PENALTY = 0.15
+
+
+def normalize_words(text: str) -> List[Tuple[str, int, int]]:
+    """Lowercase words of ``text`` with their character spans."""
+    return [(match.group(0), match.start(), match.end()) for match in WORD_PATTERN.finditer(text.lower())]
+
+
+class RegionMatcher:
+    """Longest-match lookup of provinsi, kota and kabupaten names in a list of words."""
+
+    def __init__(self, names: Dict[str, List[str]]):
+        self.names: Dict[Tuple[str, ...], str] = {}
+        for level in ("kabupaten", "kota", "provinsi"):
+            for name in names.get(level, []):
+                words = tuple(word for word, _, _ in normalize_words(name))
+                if words:
+                    self.names[words] = name
+        self.longest = max((len(words) for words in self.names), default=0)
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, words: List[str]) -> List[Tuple[int, int]]:
+        """Word ranges [start, end) of every region name, longest match first, left to right."""
+        found = []
+        position = 0
+        while position < len(words):
+            for size in range(min(self.longest, len(words) - position), 0, -1):
+                if tuple(words[position:position + size]) in self.names:
+                    found.append((position, position + size))
+                    position += size
+                    break
+            else:
+                position += 1
+        return found
+
+
+@dataclass
+class RuleIntent:
+    """A parsed intent with the same fields as the LLM's Intent, plus its confidence."""
+    needs: str
+    location: Optional[List[str]]
+    date: Optional[List[str]]
+    chart: Optional[int]
+    information: str
+    confidence: float
+
+
+@dataclass
+class IntentStats:
+    """Hit-rate counters of the fast path."""
+    fast_path: int = 0
+    fallback: int = 0
+    routes: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, intent: Optional[RuleIntent]):
+        if intent is None:
+            self.fallback += 1
+        else:
+            self.fast_path += 1
+            self.routes[intent.needs] = self.routes.get(intent.needs, 0) + 1
+
+    def as_dict(self) -> Dict:
+        total = self.fast_path + self.fallback
+        return {
+            "fast_path": self.fast_path,
+            "fallback": self.fallback,
+            "hit_rate": self.fast_path / total if total else 0.0,
+            "routes": dict(self.routes),
+        }
+
+
+class IntentClassifier:
+    """Confidence-scored rules for the formulaic messages the LLM does not need to read."""
+
+    def __init__(self, threshold: float = INTENT_FAST_PATH_THRESHOLD, retry_after: float = INTENT_REGIONS_RETRY):
+        self.threshold = threshold
+        self.retry_after = retry_after
+        self.regions: Optional[RegionMatcher] = None
+        self.failed_at: Optional[float] = None
+        self.counters = IntentStats()
+        self._lock = asyncio.Lock()
+
+    def _backing_off(self) -> bool:
+        return self.failed_at is not None and time.monotonic() - self.failed_at < self.retry_after
+
+    async def load(self) -> bool:
+        """Fetch the region names from the Tool API once; after a failure, retried only once ``retry_after`` has passed."""
+        if self.regions is not None:
+            return True
+        if self._backing_off():
+            return False
+        async with self._lock:
+            if self.regions is None and not self._backing_off():
+                try:
+                    async with await tool_api.get("/api/data/regions") as response:
+                        if response.status == 200:
+                            response_data = await response.json()
+                            self.regions = RegionMatcher(response_data.get("data", {}))
+                        else:
+                            print(f"Region names for the intent fast path not loaded: HTTP {response.status}")
+                except Exception as e:
+                    print(f"Region names for the intent fast path not loaded: {e}")
+                self.failed_at = None if self.regions is not None else time.monotonic()
+        return self.regions is not None
+
+    def score(self, message: str) -> Optional[RuleIntent]:
+        """Parse ``message``; None when it names neither a chart nor the harvest data, or negates or dates relatively."""
+        text = message.lower()
+        tokens = normalize_words(text)
+        words = [word for word, _, _ in tokens]
+        if not words or self.regions is None:
+            return None
+        if NEGATION_WORDS.intersection(words) or RELATIVE_TIME_WORDS.intersection(words):
+            return None
+
+        covered = [False] * len(words)
+
+        def cover_span(start: int, end: int):
+            for position, (_, word_start, word_end) in enumerate(tokens):
+                if word_start >= start and word_end <= end:
+                    covered[position] = True
+
+        # Route signal: a single chart number, or the harvest data
+        charts = {int(match.group(1)) for match in CHART_PATTERN.finditer(text)}
+        if len(charts) > 1:
+            return None
+        for match in CHART_PATTERN.finditer(text):
+            cover_span(match.start(), match.end())
+        panen = DATA_PANEN_PATTERN.search(text)
+        if panen:
+            cover_span(panen.start(), panen.end())
+        if charts:
+            needs, chart = "analyze_chart", charts.pop()
+        elif panen:
+            needs, chart = "analyze_data_panen", None
+        else:
+            return None
+
+        # Regions, keeping the user's spelling for the Tool API to resolve
+        location = []
+        for start, end in self.regions.find(words):
+            if start > 0 and words[start - 1] in REGION_PREFIXES:
+                start -= 1
+            location.append(message[tokens[start][1]:tokens[end - 1][2]])
+            for position in range(start, end):
+                covered[position] = True
+
+        # Months and years
+        months = []
+        years = []
+        for position, word in enumerate(words):
+            if word in MONTHS:
+                months.append(MONTHS[word])
+                covered[position] = True
+            elif YEAR_PATTERN.fullmatch(word):
+                years.append(word)
+                covered[position] = True
+        year = years[0] if years else str(datetime.now().year)
+        date = [f"{month} {year}" for month in months] or (years or None)
+
+        explain = False
+        question = "?" in text
+        unmatched_location = False
+        for position, word in enumerate(words):
+            if word in EXPLAIN_WORDS:
+                explain = covered[position] = True
+            elif word in QUESTION_WORDS:
+                question = True
+            elif word in FILLER_WORDS:
+                covered[position] = True
+            if word in LOCATION_CUES and position + 1 < len(words):
+                following = words[position + 1]
+                if not covered[position + 1] and following not in LOCATION_CUES and following not in NATIONAL_WORDS:
+                    unmatched_location = True
+
+        coverage = sum(covered) / len(words)
+        confidence = 0.5 + (0.2 if explain else 0.0) + 0.3 * coverage
+        confidence -= UNKNOWN_WORD_PENALTY * covered.count(False)
+        if question:
+            confidence -= 0.3
+        if unmatched_location:
+            confidence -= 0.5
+
+        return RuleIntent(
+            needs=needs,
+            location=location or None,
+            date=date,
+            chart=chart,
+            information=message.strip(),
+            confidence=round(max(confidence, 0.0), 3),
+        )
+
+    async def classify(self, message: str) -> Optional[RuleIntent]:
+        """The parsed intent when it clears the threshold, otherwise None (use the LLM)."""
+        intent = self.score(message) if await self.load() else None
+        if intent is not None and intent.confidence < self.threshold:
+            intent = None
+        self.counters.record(intent)
+        return intent
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters.as_dict(),
+            "threshold": self.threshold,
+            "regions": len(self.regions) if self.regions is not None else 0,
+        }
+
+
+intent_classifier = IntentClassifier()
@@ -0,0 +1,83 @@
+"""
+Shared HTTP client for the Tool API.
+One aiohttp session with a keep-alive connection pool is created when the app starts
+and closed when it stops, so tool calls reuse open connections to tool-api instead of
+paying for DNS and TCP setup on every request.
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+import aiohttp
+
+# Configuration
+base_url = os.getenv("TOOL_API_URL", "http://tool-api:8011")
+
+# Connection pool: total connections, connections per host, idle keep-alive (seconds)
+TOOL_API_POOL_SIZE = int(os.getenv("TOOL_API_POOL_SIZE", "100"))
+TOOL_API_POOL_PER_HOST = int(os.getenv("TOOL_API_POOL_PER_HOST", "20"))
+TOOL_API_KEEPALIVE = float(os.getenv("TOOL_API_KEEPALIVE", "30"))
+TOOL_API_TIMEOUT = float(os.getenv("TOOL_API_TIMEOUT", "10"))
+TOOL_API_DNS_TTL = int(os.getenv("TOOL_API_DNS_TTL", "300"))
+
+
+class ToolApiClient:
+    """A single pooled aiohttp session bound to the event loop it was started on."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> aiohttp.ClientSession:
+        """Open the session on the running loop (reused if it is already open there)."""
+        loop = asyncio.get_running_loop()
+        if self.session is not None and not self.session.closed and self.loop is loop:
+            return self.session
+
+        connector = aiohttp.TCPConnector(
+            limit=TOOL_API_POOL_SIZE,
+            limit_per_host=TOOL_API_POOL_PER_HOST,
+            keepalive_timeout=TOOL_API_KEEPALIVE,
+            ttl_dns_cache=TOOL_API_DNS_TTL,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=TOOL_API_TIMEOUT),
+        )
+        self.loop = loop
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        self.loop = None
+
+    async def get(self, endpoint: str, timeout: Optional[float] = None) -> aiohttp.ClientResponse:
+        session = await self.start()
+        return await session.get(f"{self.base_url}{endpoint}", timeout=self._timeout(timeout))
+
+    async def post_json(self, endpoint: str, payload: dict, timeout: Optional[float] = None) -> tuple:
+        """POST a JSON body and return (status, decoded JSON or None)."""
+        session = await self.start()
+        async with session.post(f"{self.base_url}{endpoint}", json=payload, timeout=self._timeout(timeout)) as response:
+            if response.status != 200:
+                return response.status, None
+            return response.status, await response.json()
+
+    def stats(self) -> dict:
+        return {
+            "open": self.session is not None and not self.session.closed,
+            "limit": TOOL_API_POOL_SIZE,
+            "limit_per_host": TOOL_API_POOL_PER_HOST,
+            "keepalive_seconds": TOOL_API_KEEPALIVE,
+        }
+
+    @staticmethod
+    def _timeout(timeout: Optional[float]) -> Optional[aiohttp.ClientTimeout]:
+        return aiohttp.ClientTimeout(total=timeout) if timeout is not None else None
+
+
+tool_api = ToolApiClient(base_url)
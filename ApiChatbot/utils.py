@@ -1,8 +1,9 @@
 import os
 from typing import Annotated, Literal, List, Optional
 from dotenv import load_dotenv
-import aiohttp
 import asyncio
+from contextvars import ContextVar
+from functools import partial
 
 from langchain_core.messages import AIMessage, HumanMessage, BaseMessage
 from langgraph.graph import END, START, StateGraph
@@ -18,23 +19,19 @@ from IPython.display import Image, display
 load_dotenv()
 
 # Configuration
-base_url = os.getenv("TOOL_API_URL", "http://tool-api:8011")
-
-import nest_asyncio
-nest_asyncio.apply()
+from tool_client import TOOL_API_TIMEOUT, tool_api
+from intent_rules import intent_classifier
 
 # Test API connection
 async def test_api_connection():
     """Test if the tool API is accessible"""
     try:
-        timeout = aiohttp.ClientTimeout(total=5)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(f"{base_url}/health") as response:
-                if response.status == 200:
-                    return True
-                else:
-                    print(f"API health check failed: HTTP {response.status}")
-                    return False
+        async with await tool_api.get("/health", timeout=5) as response:
+            if response.status == 200:
+                return True
+            else:
+                print(f"API health check failed: HTTP {response.status}")
+                return False
     except Exception as e:
         print(f"API connection test failed: {e}")
         return False
@@ -140,312 +137,131 @@ chart_explainer_agent = Agent(
     ),
 )
 
-import aiohttp
-import asyncio
-
-async def get_data_panen_prompt_summary(location: Optional[str] = None):
-    endpoint = "/api/data/ringkasan"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get("data", {}).get("summary", "No summary available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-
-
-async def get_data_total_panen(location: Optional[str] = None):
-    endpoint = "/api/data/total-panen"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-
-async def get_data_wilayah_panen_tertinggi(location: Optional[str] = None):
-    endpoint = "/api/data/wilayah-panen-tertinggi"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-    
-async def get_data_wilayah_efektif_alsintan(location: Optional[str] = None):
-    endpoint = "/api/data/efektifitas-alsintan"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-    
-async def get_parent_data(location: Optional[str] = None):
-    endpoint = "/api/data/parent"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-    
-async def get_data_panen(location: Optional[str] = None):
-    endpoint = "/api/data/panen"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-
-async def get_data_iklim(location: Optional[str] = None):
-    endpoint = "/api/data/iklim"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-    
-async def get_data_ksa(location: Optional[str] = None):
-    endpoint = "/api/data/ksa"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-    
-async def get_chart_one(location: Optional[str] = None):
-    endpoint = "/api/charts/climate"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-    
-async def get_chart_two(location: Optional[str] = None):
-    endpoint = "/api/charts/harvest-regions"
-    data = {"region": location if location else "indonesia"}
-
-    url = f"{base_url}{endpoint}"
+# STREAMING
+# While /api/chat/stream is listening, graph nodes publish progress events and model tokens
+# to the queue of the current chat; without a listener these are no-ops.
+chat_events: ContextVar[Optional[asyncio.Queue]] = ContextVar("chat_events", default=None)
+
+def emit(event: str, data) -> None:
+    queue = chat_events.get()
+    if queue is not None:
+        queue.put_nowait((event, data))
+
+async def run_agent(agent: Agent, prompt: str) -> str:
+    """Run an agent and return its text, streaming it as token events when a chat stream is listening"""
+    if chat_events.get() is None:
+        result = await agent.run(prompt)
+        return result.output
+
+    parts = []
+    async with agent.run_stream(prompt) as result:
+        async for delta in result.stream_text(delta=True):
+            parts.append(delta)
+            emit("token", delta)
+    return "".join(parts)
+
+async def fetch_tool_data(endpoint: str, location: Optional[str] = None, field: Optional[str] = None, default: str = "No data available"):
+    """POST a region to a Tool API endpoint over the shared pool and return its data (or an error message)"""
+    payload = {"region": location if location else "indonesia"}
     try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
+        status, response_data = await tool_api.post_json(endpoint, payload)
+        emit("data", {"endpoint": endpoint, "status": status})
+        if response_data is None:
+            return f"API error: HTTP {status}"
+        data = response_data.get("data", {} if field else default)
+        return data.get(field, default) if field else data
     except asyncio.TimeoutError:
         return "Request timeout - API tidak merespons"
     except Exception as e:
         return f"Terjadi kesalahan: {e}"
-    
-async def get_chart_three(location: Optional[str] = None):
-    endpoint = "/api/charts/harvest-vs-ksa"
-    data = {"region": location if location else "indonesia"}
 
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-    
-async def get_chart_four(location: Optional[str] = None):
-    endpoint = "/api/charts/machinery-effectiveness"
-    data = {"region": location if location else "indonesia"}
+get_data_panen_prompt_summary = partial(fetch_tool_data, "/api/data/ringkasan", field="summary", default="No summary available")
+get_data_total_panen = partial(fetch_tool_data, "/api/data/total-panen")
+get_data_wilayah_panen_tertinggi = partial(fetch_tool_data, "/api/data/wilayah-panen-tertinggi")
+get_data_wilayah_efektif_alsintan = partial(fetch_tool_data, "/api/data/efektifitas-alsintan")
+get_parent_data = partial(fetch_tool_data, "/api/data/parent")
+get_data_panen = partial(fetch_tool_data, "/api/data/panen")
+get_data_iklim = partial(fetch_tool_data, "/api/data/iklim")
+get_data_ksa = partial(fetch_tool_data, "/api/data/ksa")
+get_chart_one = partial(fetch_tool_data, "/api/charts/climate")
+get_chart_two = partial(fetch_tool_data, "/api/charts/harvest-regions")
+get_chart_three = partial(fetch_tool_data, "/api/charts/harvest-vs-ksa")
+get_chart_four = partial(fetch_tool_data, "/api/charts/machinery-effectiveness")
 
-    url = f"{base_url}{endpoint}"
-    try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=data) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return response_data.get("data", "No data available")
-                else:
-                    return f"API error: HTTP {response.status}"
-    except asyncio.TimeoutError:
-        return "Request timeout - API tidak merespons"
-    except Exception as e:
-        return f"Terjadi kesalahan: {e}"
-    
 # CALLING TOOLS
 
 def tool_cek_daerah(user_input: str):
     return cek_date(user_input)
 
-def tool_get_iklim(location: Optional[str] = None):
+async def tool_get_iklim(location: Optional[str] = None):
     try:
-        return asyncio.run(get_data_iklim(location))
+        return await get_data_iklim(location)
     except Exception as e:
         return f"Error getting climate data: {str(e)}"
 
-def tool_get_ksa(location: Optional[str] = None):
+async def tool_get_ksa(location: Optional[str] = None):
     try:
-        return asyncio.run(get_data_ksa(location))
+        return await get_data_ksa(location)
     except Exception as e:
         return f"Error getting KSA data: {str(e)}"
 
-def tool_get_data_panen(location: Optional[str] = None):
+async def tool_get_data_panen(location: Optional[str] = None):
     try:
-        return asyncio.run(get_data_panen(location))
+        return await get_data_panen(location)
     except Exception as e:
         return f"Error getting harvest data: {str(e)}"
 
-def tool_get_data_panen_prompt_summary(location: Optional[str] = None):
+async def tool_get_data_panen_prompt_summary(location: Optional[str] = None):
     try:
-        return asyncio.run(get_data_panen_prompt_summary(location))
+        return await get_data_panen_prompt_summary(location)
     except Exception as e:
         return f"Error getting harvest summary: {str(e)}"
 
-def tool_get_wilayah_panen_tertinggi(location: Optional[str] = None):
+async def tool_get_wilayah_panen_tertinggi(location: Optional[str] = None):
     try:
-        return asyncio.run(get_data_wilayah_panen_tertinggi(location))
+        return await get_data_wilayah_panen_tertinggi(location)
     except Exception as e:
         return f"Error getting top harvest regions: {str(e)}"
 
-def tool_get_wilayah_efektif_alsintan(location: Optional[str] = None):
+async def tool_get_wilayah_efektif_alsintan(location: Optional[str] = None):
     try:
-        return asyncio.run(get_data_wilayah_efektif_alsintan(location))
+        return await get_data_wilayah_efektif_alsintan(location)
     except Exception as e:
         return f"Error getting machinery effectiveness data: {str(e)}"
 
-def tool_get_total_panen(location: Optional[str] = None):
+async def tool_get_total_panen(location: Optional[str] = None):
     try:
-        return asyncio.run(get_data_total_panen(location))
+        return await get_data_total_panen(location)
     except Exception as e:
         return f"Error getting total harvest data: {str(e)}"
 
-def tool_get_daerah(location: Optional[str] = None):
+async def tool_get_daerah(location: Optional[str] = None):
     try:
-        return asyncio.run(get_parent_data(location))
+        return await get_parent_data(location)
     except Exception as e:
         return f"Error getting region data: {str(e)}"
 
-def tool_get_chart_one(location: Optional[str] = None):
+async def tool_get_chart_one(location: Optional[str] = None):
     try:
-        return asyncio.run(get_chart_one(location))
+        return await get_chart_one(location)
     except Exception as e:
         return f"Error getting chart 1 data: {str(e)}"
 
-def tool_get_chart_two(location: Optional[str] = None):
+async def tool_get_chart_two(location: Optional[str] = None):
     try:
-        return asyncio.run(get_chart_two(location))
+        return await get_chart_two(location)
     except Exception as e:
         return f"Error getting chart 2 data: {str(e)}"
 
-def tool_get_chart_three(location: Optional[str] = None):
+async def tool_get_chart_three(location: Optional[str] = None):
     try:
-        return asyncio.run(get_chart_three(location))
+        return await get_chart_three(location)
     except Exception as e:
         return f"Error getting chart 3 data: {str(e)}"
 
-def tool_get_chart_four(location: Optional[str] = None):
+async def tool_get_chart_four(location: Optional[str] = None):
     try:
-        return asyncio.run(get_chart_four(location))
+        return await get_chart_four(location)
     except Exception as e:
         return f"Error getting chart 4 data: {str(e)}"
 
@@ -483,65 +299,91 @@ normal_mode_agent = Agent(
     ]
 )
 
-def sum_tabular(location: str = None) -> str:
-    data_panen_total = asyncio.run(get_data_total_panen(location))
-    data_wilayah_panen_tertinggi = asyncio.run(get_data_wilayah_panen_tertinggi(location))
-    data_wilayah_efektif_alsintan = asyncio.run(get_data_wilayah_efektif_alsintan(location))
-    data_summary = asyncio.run(get_data_panen_prompt_summary(location))
+# Sources gathered for each part of the summary prompt
+TABULAR_SOURCES = {
+    "total_panen": get_data_total_panen,
+    "wilayah_panen_tertinggi": get_data_wilayah_panen_tertinggi,
+    "efektifitas_alsintan": get_data_wilayah_efektif_alsintan,
+    "ringkasan": get_data_panen_prompt_summary,
+}
+KSA_SOURCES = {"ksa": get_data_ksa}
+IKLIM_SOURCES = {"iklim": get_data_iklim}
+
+# Shared deadline (seconds) for one concurrent fan-out, not per source
+SUMMARY_DEADLINE = float(os.getenv("SUMMARY_DEADLINE", str(TOOL_API_TIMEOUT)))
+
+async def gather_tool_data(sources: dict, location: Optional[str] = None, deadline: float = SUMMARY_DEADLINE) -> dict:
+    """Fetch every source concurrently under one deadline; a failed or late source becomes its error message"""
+    tasks = {name: asyncio.ensure_future(fetch(location)) for name, fetch in sources.items()}
+    _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    results = {}
+    for name, task in tasks.items():
+        if task in pending:
+            results[name] = "Request timeout - API tidak merespons"
+        elif task.exception() is not None:
+            results[name] = f"Terjadi kesalahan: {task.exception()}"
+        else:
+            results[name] = task.result()
+    return results
 
-    data_panen_prompt = f'''
+def tabular_prompt(data: dict) -> str:
+    return f'''
     Data panen ini dari SIMOTANDI data yang diambil dari proses citra satelit
-    Total Panen: {data_panen_total}
-    Wilayah Panen Tertinggi: {data_wilayah_panen_tertinggi}
-    Wilayah Efektifitas Alsintan: {data_wilayah_efektif_alsintan}
+    Total Panen: {data["total_panen"]}
+    Wilayah Panen Tertinggi: {data["wilayah_panen_tertinggi"]}
+    Wilayah Efektifitas Alsintan: {data["efektifitas_alsintan"]}
     Ringkasan Data Panen:
-    {data_summary}
+    {data["ringkasan"]}
     '''
 
-    return data_panen_prompt
-
-def sum_ksa(location: str = None) -> str:
-    data_ksa_total = asyncio.run(get_data_ksa(location))
-
-    data_ksa_prompt = f'''
+def ksa_prompt(data: dict) -> str:
+    return f'''
     KSA (Kerangka Sampling Area) adalah data yang didapatkan dari Badan Pusat Statistik (BPS) sebagai perbandingan dari data panen SIMOTANDI
-    Data KSA: {data_ksa_total}
+    Data KSA: {data["ksa"]}
     '''
-    return data_ksa_prompt
 
-def sum_iklim(location: str = None) -> str:
-    data_iklim = asyncio.run(get_data_iklim(location))
-
-    data_iklim_prompt = f'''
+def iklim_prompt(data: dict) -> str:
+    return f'''
     Data iklim digunakan untuk melihat kemungkinan kenapa terjadi perubahan hasil panen padi
-    Data Iklim: {data_iklim}
+    Data Iklim: {data["iklim"]}
     '''
-    return data_iklim_prompt
 
-import asyncio
+async def sum_tabular(location: str = None) -> str:
+    return tabular_prompt(await gather_tool_data(TABULAR_SOURCES, location))
+
+async def sum_ksa(location: str = None) -> str:
+    return ksa_prompt(await gather_tool_data(KSA_SOURCES, location))
 
-def get_chart_data(chart_number: int, location: str = None):
+async def sum_iklim(location: str = None) -> str:
+    return iklim_prompt(await gather_tool_data(IKLIM_SOURCES, location))
+
+async def get_chart_data(chart_number: int, location: str = None):
     match chart_number:
         case 1:
-            ascii_data = f"Chart dalam bentuk radar tentang cuaca pada tiap daerah {asyncio.run(get_chart_one(location))}"
+            ascii_data = f"Chart dalam bentuk radar tentang cuaca pada tiap daerah {await get_chart_one(location)}"
         case 2:
-            ascii_data = f"Chart dalam bentuk batang tentang top 10 wilayah terbaik {asyncio.run(get_chart_two(location))}"
+            ascii_data = f"Chart dalam bentuk batang tentang top 10 wilayah terbaik {await get_chart_two(location)}"
         case 3:
-            ascii_data = f"Chart dalam bentuk garis tentang perbandingan data panen dari simotandi dan KSA {asyncio.run(get_chart_three(location))}"
+            ascii_data = f"Chart dalam bentuk garis tentang perbandingan data panen dari simotandi dan KSA {await get_chart_three(location)}"
         case 4:
-            ascii_data = f"Chart dalam bentuk pie tentang wilayah yang terbaik {asyncio.run(get_chart_four(location))}"
+            ascii_data = f"Chart dalam bentuk pie tentang wilayah yang terbaik {await get_chart_four(location)}"
         case 5:
-            ascii_data = f"Data panen dalam tabel {asyncio.run(get_data_panen(location))}"
+            ascii_data = f"Data panen dalam tabel {await get_data_panen(location)}"
         case _:
             return f"Data untuk chart {chart_number} tidak ditemukan."
     
     return f"Data untuk chart {chart_number}: {ascii_data}"
 
 
-def summarize_agent(location: str = None, information: str = None) -> str:
-    data_tabular = sum_tabular(location)
-    data_ksa = sum_ksa(location)
-    data_iklim = sum_iklim(location)
+async def summarize_agent(location: str = None, information: str = None) -> str:
+    # All six sources in one fan-out: the data stage takes as long as the slowest call
+    data = await gather_tool_data({**TABULAR_SOURCES, **KSA_SOURCES, **IKLIM_SOURCES}, location)
+    data_tabular = tabular_prompt(data)
+    data_ksa = ksa_prompt(data)
+    data_iklim = iklim_prompt(data)
 
     combined_info = (
         f"{information}\n"
@@ -550,29 +392,37 @@ def summarize_agent(location: str = None, information: str = None) -> str:
         f"{data_iklim}\n"
     )
 
-    summary = sumarizer_agent.run_sync(combined_info)
-    return summary.output
+    return await run_agent(sumarizer_agent, combined_info)
 
-def explain_chart_agent(chart_number: int, information: str = None, location: str = None) -> str:
-    chart_data = get_chart_data(chart_number, location)
+async def explain_chart_agent(chart_number: int, information: str = None, location: str = None) -> str:
+    chart_data = await get_chart_data(chart_number, location)
     prompt = f'''
     {information}
     Jelaskan pada data yang digunakan pada chart
     {chart_data}
     '''
 
-    explanation = chart_explainer_agent.run_sync(prompt)
-    return explanation.output
+    return await run_agent(chart_explainer_agent, prompt)
 
-def get_intent(state: State) -> State:
+async def get_intent(state: State) -> State:
     user_input = state["input"][-1].content
-    result = state_intent_agent.run_sync(user_input)
-    
-    state['route'] = result.output.needs
-    state['target_information'] = result.output.information
-    state['target_location'] = result.output.location
-    state['target_date'] = result.output.date
-    state['target_chart'] = result.output.chart
+    # Formulaic messages are parsed by rules; everything else goes to the LLM
+    intent = await intent_classifier.classify(user_input)
+    if intent is None:
+        result = await state_intent_agent.run(user_input)
+        intent = result.output
+
+    state['route'] = intent.needs
+    state['target_information'] = intent.information
+    state['target_location'] = intent.location
+    state['target_date'] = intent.date
+    state['target_chart'] = intent.chart
+    emit("intent", {
+        "route": state['route'],
+        "location": state['target_location'],
+        "date": state['target_date'],
+        "chart": state['target_chart'],
+    })
 
     return state
 
@@ -584,7 +434,7 @@ def router(state: State):
     else:
         return 'normal_mode'
     
-def analyze_data_panen_agent(state: State):
+async def analyze_data_panen_agent(state: State):
     location_list = state.get('target_location')
     # Handle location - convert list to string or use first item
     location_to_analyze = None
@@ -595,11 +445,11 @@ def analyze_data_panen_agent(state: State):
     
     information = state.get('target_information')
     
-    summary = summarize_agent(location_to_analyze, information)
+    summary = await summarize_agent(location_to_analyze, information)
     state['output'] = summary
     return state
 
-def analyze_chart_agent(state: State):
+async def analyze_chart_agent(state: State):
     chart_number = state.get('target_chart')
     information = state.get('target_information')
     location_list = state.get('target_location')
@@ -611,18 +461,16 @@ def analyze_chart_agent(state: State):
     elif isinstance(location_list, str):
         location_to_analyze = location_list
 
-    summary = explain_chart_agent(chart_number, information, location_to_analyze)
+    summary = await explain_chart_agent(chart_number, information, location_to_analyze)
 
     state["output"] = summary
     return state
 
-def normal_chat_agent(state: State) -> State:
+async def normal_chat_agent(state: State) -> State:
     query = state['input'][-1].content
     
     # Run the normal mode agent directly
-    answer = normal_mode_agent.run_sync(query)
-
-    state['output'] = answer.output
+    state['output'] = await run_agent(normal_mode_agent, query)
     return state
 
 
@@ -677,7 +525,7 @@ router_builder.add_edge(
 router_workflow = router_builder.compile()
 
 # API WRAPPER FUNCTION
-def get_chat_response(message: str) -> str:
+async def get_chat_response(message: str) -> str:
     """
     Function wrapper untuk dipanggil dari API
     Args:
@@ -689,7 +537,7 @@ def get_chat_response(message: str) -> str:
         if not message or message.strip() == "":
             return "Silakan berikan pertanyaan yang ingin Anda tanyakan."
         
-        result = router_workflow.invoke({
+        result = await router_workflow.ainvoke({
             "input": [HumanMessage(content=message.strip())],
         })
         
@@ -703,4 +551,35 @@ def get_chat_response(message: str) -> str:
         elif "connection" in error_msg.lower():
             return "Maaf, terjadi masalah koneksi. Pastikan layanan API sedang berjalan."
         else:
-            return f"Maaf, terjadi kesalahan: {error_msg[:100]}..."
\ No newline at end of file
+            return f"Maaf, terjadi kesalahan: {error_msg[:100]}..."
+
+async def stream_chat_response(message: str):
+    """
+    Streaming variant of get_chat_response
+    Yields (event, data) pairs: "intent" and "data" progress events while the graph runs,
+    "token" for each piece of model text, then "done" with the complete answer
+    """
+    queue = asyncio.Queue()
+    reset = chat_events.set(queue)
+    try:
+        # The task copies the current context, so its nodes publish to this queue
+        task = asyncio.create_task(get_chat_response(message))
+    finally:
+        chat_events.reset(reset)
+
+    try:
+        while True:
+            next_event = asyncio.ensure_future(queue.get())
+            await asyncio.wait({next_event, task}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_event.done():
+                next_event.cancel()
+                break
+            yield next_event.result()
+
+        while not queue.empty():
+            yield queue.get_nowait()
+        yield "done", {"response": task.result()}
+    finally:
+        # Stop the graph if the client went away mid-stream
+        if not task.done():
+            task.cancel()
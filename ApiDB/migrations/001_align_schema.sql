@@ -0,0 +1,62 @@
+-- 001: Samakan skema tabel dengan model ORM di ApiTool/utils.py dan insert_data.py
+-- Versi lama init.sql membuat data_panen dengan kolom yang tidak dipakai aplikasi
+-- (bulan, tahun, luas_tanam, ...). Tabel tersebut hanya berisi data contoh, jadi dibuat ulang.
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.tables
+        WHERE table_schema = current_schema() AND table_name = 'data_panen'
+    ) AND NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'data_panen'
+          AND column_name = 'perkiraan_panen_september'
+    ) THEN
+        DROP TABLE data_panen;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS data_panen (
+    id SERIAL PRIMARY KEY,
+    provinsi VARCHAR NOT NULL,
+    kabupaten VARCHAR NOT NULL,
+    kecamatan VARCHAR NOT NULL,
+    perkiraan_panen_september INTEGER,
+    perkiraan_panen_oktober INTEGER,
+    alsintan_september INTEGER,
+    alsintan_oktober INTEGER,
+    bera INTEGER,
+    penggenangan INTEGER,
+    tanam INTEGER,
+    vegetatif_1 INTEGER,
+    vegetatif_2 INTEGER,
+    max_vegetatif INTEGER,
+    generatif_1 INTEGER,
+    generatif_2 INTEGER,
+    panen INTEGER,
+    standing_crop INTEGER,
+    luas_baku_sawah INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS data_iklim (
+    id SERIAL PRIMARY KEY,
+    stasiun VARCHAR NOT NULL,
+    provinsi VARCHAR NOT NULL,
+    bulan VARCHAR NOT NULL,
+    curah_hujan INTEGER,
+    suhu INTEGER,
+    kelembaban INTEGER,
+    lama_penyinaran INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS data_ksa (
+    id SERIAL PRIMARY KEY,
+    provinsi VARCHAR NOT NULL,
+    kabupaten VARCHAR NOT NULL,
+    bulan VARCHAR NOT NULL,
+    tahun INTEGER NOT NULL,
+    luas_panen INTEGER,
+    produksi_beras INTEGER,
+    produksi_padi INTEGER
+);
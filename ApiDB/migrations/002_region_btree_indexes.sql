@@ -0,0 +1,17 @@
+-- 002: Index B-tree komposit untuk filter wilayah dan periode
+
+-- Data nasional/provinsi memakai baris agregat (kabupaten = '-', kecamatan = '-')
+CREATE INDEX IF NOT EXISTS ix_data_panen_provinsi_kabupaten_kecamatan
+    ON data_panen (provinsi, kabupaten, kecamatan);
+CREATE INDEX IF NOT EXISTS ix_data_panen_kabupaten_kecamatan
+    ON data_panen (kabupaten, kecamatan);
+
+CREATE INDEX IF NOT EXISTS ix_data_iklim_provinsi_bulan
+    ON data_iklim (provinsi, bulan);
+CREATE INDEX IF NOT EXISTS ix_data_iklim_bulan
+    ON data_iklim (bulan);
+
+CREATE INDEX IF NOT EXISTS ix_data_ksa_kabupaten_bulan_tahun
+    ON data_ksa (kabupaten, bulan, tahun);
+CREATE INDEX IF NOT EXISTS ix_data_ksa_provinsi_bulan_tahun
+    ON data_ksa (provinsi, bulan, tahun);
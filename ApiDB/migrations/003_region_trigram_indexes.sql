@@ -0,0 +1,18 @@
+-- 003: Index trigram (pg_trgm) untuk filter ILIKE '%nama%' pada nama wilayah
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_data_panen_provinsi_trgm
+    ON data_panen USING gin (provinsi gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_panen_kabupaten_trgm
+    ON data_panen USING gin (kabupaten gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_panen_kecamatan_trgm
+    ON data_panen USING gin (kecamatan gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_data_iklim_provinsi_trgm
+    ON data_iklim USING gin (provinsi gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_data_ksa_provinsi_trgm
+    ON data_ksa USING gin (provinsi gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_ksa_kabupaten_trgm
+    ON data_ksa USING gin (kabupaten gin_trgm_ops);
@@ -0,0 +1,103 @@
+-- 004: Tabel agregat (materialized view) yang di-refresh oleh insert_data.py setelah ingest
+-- Endpoint membaca baris yang sudah dihitung, bukan menjumlah ulang data mentah tiap request.
+
+-- Total nasional dari baris agregat provinsi (kabupaten = '-', kecamatan = '-')
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_panen_nasional AS
+SELECT
+    COALESCE(SUM(perkiraan_panen_september), 0)::BIGINT AS perkiraan_panen_september,
+    COALESCE(SUM(perkiraan_panen_oktober), 0)::BIGINT AS perkiraan_panen_oktober,
+    COALESCE(SUM(alsintan_september), 0)::BIGINT AS alsintan_september,
+    COALESCE(SUM(alsintan_oktober), 0)::BIGINT AS alsintan_oktober,
+    COALESCE(SUM(bera), 0)::BIGINT AS bera,
+    COALESCE(SUM(penggenangan), 0)::BIGINT AS penggenangan,
+    COALESCE(SUM(tanam), 0)::BIGINT AS tanam,
+    COALESCE(SUM(vegetatif_1), 0)::BIGINT AS vegetatif_1,
+    COALESCE(SUM(vegetatif_2), 0)::BIGINT AS vegetatif_2,
+    COALESCE(SUM(max_vegetatif), 0)::BIGINT AS max_vegetatif,
+    COALESCE(SUM(generatif_1), 0)::BIGINT AS generatif_1,
+    COALESCE(SUM(generatif_2), 0)::BIGINT AS generatif_2,
+    COALESCE(SUM(panen), 0)::BIGINT AS panen,
+    COALESCE(SUM(standing_crop), 0)::BIGINT AS standing_crop,
+    COALESCE(SUM(luas_baku_sawah), 0)::BIGINT AS luas_baku_sawah
+FROM data_panen
+WHERE kabupaten = '-' AND kecamatan = '-';
+
+-- Total per provinsi (id = baris agregat asli, agar bentuk respons tetap sama)
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_panen_provinsi AS
+SELECT
+    MIN(id) AS id,
+    provinsi,
+    '-'::VARCHAR AS kabupaten,
+    '-'::VARCHAR AS kecamatan,
+    COALESCE(SUM(perkiraan_panen_september), 0)::BIGINT AS perkiraan_panen_september,
+    COALESCE(SUM(perkiraan_panen_oktober), 0)::BIGINT AS perkiraan_panen_oktober,
+    COALESCE(SUM(alsintan_september), 0)::BIGINT AS alsintan_september,
+    COALESCE(SUM(alsintan_oktober), 0)::BIGINT AS alsintan_oktober,
+    COALESCE(SUM(bera), 0)::BIGINT AS bera,
+    COALESCE(SUM(penggenangan), 0)::BIGINT AS penggenangan,
+    COALESCE(SUM(tanam), 0)::BIGINT AS tanam,
+    COALESCE(SUM(vegetatif_1), 0)::BIGINT AS vegetatif_1,
+    COALESCE(SUM(vegetatif_2), 0)::BIGINT AS vegetatif_2,
+    COALESCE(SUM(max_vegetatif), 0)::BIGINT AS max_vegetatif,
+    COALESCE(SUM(generatif_1), 0)::BIGINT AS generatif_1,
+    COALESCE(SUM(generatif_2), 0)::BIGINT AS generatif_2,
+    COALESCE(SUM(panen), 0)::BIGINT AS panen,
+    COALESCE(SUM(standing_crop), 0)::BIGINT AS standing_crop,
+    COALESCE(SUM(luas_baku_sawah), 0)::BIGINT AS luas_baku_sawah
+FROM data_panen
+WHERE kabupaten = '-' AND kecamatan = '-'
+GROUP BY provinsi;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_panen_provinsi ON mv_panen_provinsi (provinsi);
+
+-- Total per kabupaten/kota
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_panen_kabupaten AS
+SELECT
+    MIN(id) AS id,
+    provinsi,
+    kabupaten,
+    '-'::VARCHAR AS kecamatan,
+    COALESCE(SUM(perkiraan_panen_september), 0)::BIGINT AS perkiraan_panen_september,
+    COALESCE(SUM(perkiraan_panen_oktober), 0)::BIGINT AS perkiraan_panen_oktober,
+    COALESCE(SUM(alsintan_september), 0)::BIGINT AS alsintan_september,
+    COALESCE(SUM(alsintan_oktober), 0)::BIGINT AS alsintan_oktober,
+    COALESCE(SUM(bera), 0)::BIGINT AS bera,
+    COALESCE(SUM(penggenangan), 0)::BIGINT AS penggenangan,
+    COALESCE(SUM(tanam), 0)::BIGINT AS tanam,
+    COALESCE(SUM(vegetatif_1), 0)::BIGINT AS vegetatif_1,
+    COALESCE(SUM(vegetatif_2), 0)::BIGINT AS vegetatif_2,
+    COALESCE(SUM(max_vegetatif), 0)::BIGINT AS max_vegetatif,
+    COALESCE(SUM(generatif_1), 0)::BIGINT AS generatif_1,
+    COALESCE(SUM(generatif_2), 0)::BIGINT AS generatif_2,
+    COALESCE(SUM(panen), 0)::BIGINT AS panen,
+    COALESCE(SUM(standing_crop), 0)::BIGINT AS standing_crop,
+    COALESCE(SUM(luas_baku_sawah), 0)::BIGINT AS luas_baku_sawah
+FROM data_panen
+WHERE kabupaten <> '-' AND kecamatan = '-'
+GROUP BY provinsi, kabupaten;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_panen_kabupaten ON mv_panen_kabupaten (provinsi, kabupaten);
+
+-- Efektivitas alsintan per baris data_panen (total_alsintan NULL jika tidak ada alsintan)
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_panen_efektivitas AS
+SELECT
+    id,
+    provinsi,
+    kabupaten,
+    kecamatan,
+    COALESCE(panen, 0) AS panen,
+    NULLIF(COALESCE(alsintan_september, 0) + COALESCE(alsintan_oktober, 0), 0) AS total_alsintan,
+    COALESCE(
+        COALESCE(luas_baku_sawah, 0)::DOUBLE PRECISION
+        / NULLIF(COALESCE(alsintan_september, 0) + COALESCE(alsintan_oktober, 0), 0),
+        0
+    ) AS efektivitas_luas,
+    COALESCE(
+        COALESCE(panen, 0)::DOUBLE PRECISION
+        / NULLIF(COALESCE(alsintan_september, 0) + COALESCE(alsintan_oktober, 0), 0),
+        0
+    ) AS efektivitas_hasil
+FROM data_panen;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_panen_efektivitas ON mv_panen_efektivitas (id);
+CREATE INDEX IF NOT EXISTS ix_mv_panen_efektivitas_hasil ON mv_panen_efektivitas (efektivitas_hasil DESC);
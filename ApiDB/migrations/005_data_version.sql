@@ -0,0 +1,10 @@
+-- 005: Penanda versi data, dinaikkan oleh insert_data.py setiap selesai ingest
+-- ApiTool memantau nilai ini untuk memuat ulang snapshot dan mengosongkan cache respons.
+
+CREATE TABLE IF NOT EXISTS data_version (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO data_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,105 @@
+-- 006: Data KSA untuk semua periode, dengan selisih bulan-ke-bulan (MoM) dan tahun-ke-tahun (YoY)
+-- Selisih dihitung sekali saat ingest (REFRESH oleh insert_data.py), bukan per request.
+
+CREATE INDEX IF NOT EXISTS ix_data_ksa_kabupaten_tahun_bulan
+    ON data_ksa (kabupaten, tahun, bulan);
+
+-- Per kabupaten/kota: periode = tahun * 12 + bulan_ke - 1, sehingga bulan sebelumnya = periode - 1
+-- dan bulan yang sama tahun lalu = periode - 12 (juga melewati pergantian tahun)
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_ksa_kabupaten AS
+WITH base AS (
+    SELECT
+        provinsi,
+        kabupaten,
+        tahun,
+        bulan,
+        array_position(ARRAY[
+            'Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+            'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember'
+        ]::VARCHAR[], bulan::VARCHAR) AS bulan_ke,
+        luas_panen,
+        produksi_beras,
+        produksi_padi
+    FROM data_ksa
+), periods AS (
+    SELECT *, tahun * 12 + bulan_ke - 1 AS periode
+    FROM base
+    WHERE bulan_ke IS NOT NULL
+)
+SELECT
+    cur.provinsi,
+    cur.kabupaten,
+    cur.tahun,
+    cur.bulan,
+    cur.bulan_ke,
+    cur.periode,
+    cur.luas_panen,
+    cur.produksi_beras,
+    cur.produksi_padi,
+    cur.luas_panen - mom.luas_panen AS luas_panen_mom,
+    cur.produksi_beras - mom.produksi_beras AS produksi_beras_mom,
+    cur.produksi_padi - mom.produksi_padi AS produksi_padi_mom,
+    (cur.luas_panen - mom.luas_panen)::DOUBLE PRECISION / NULLIF(mom.luas_panen, 0) * 100 AS luas_panen_mom_pct,
+    (cur.produksi_beras - mom.produksi_beras)::DOUBLE PRECISION / NULLIF(mom.produksi_beras, 0) * 100 AS produksi_beras_mom_pct,
+    (cur.produksi_padi - mom.produksi_padi)::DOUBLE PRECISION / NULLIF(mom.produksi_padi, 0) * 100 AS produksi_padi_mom_pct,
+    cur.luas_panen - yoy.luas_panen AS luas_panen_yoy,
+    cur.produksi_beras - yoy.produksi_beras AS produksi_beras_yoy,
+    cur.produksi_padi - yoy.produksi_padi AS produksi_padi_yoy,
+    (cur.luas_panen - yoy.luas_panen)::DOUBLE PRECISION / NULLIF(yoy.luas_panen, 0) * 100 AS luas_panen_yoy_pct,
+    (cur.produksi_beras - yoy.produksi_beras)::DOUBLE PRECISION / NULLIF(yoy.produksi_beras, 0) * 100 AS produksi_beras_yoy_pct,
+    (cur.produksi_padi - yoy.produksi_padi)::DOUBLE PRECISION / NULLIF(yoy.produksi_padi, 0) * 100 AS produksi_padi_yoy_pct
+FROM periods cur
+LEFT JOIN periods mom
+    ON mom.provinsi = cur.provinsi AND mom.kabupaten = cur.kabupaten AND mom.periode = cur.periode - 1
+LEFT JOIN periods yoy
+    ON yoy.provinsi = cur.provinsi AND yoy.kabupaten = cur.kabupaten AND yoy.periode = cur.periode - 12;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_ksa_kabupaten
+    ON mv_ksa_kabupaten (provinsi, kabupaten, periode);
+CREATE INDEX IF NOT EXISTS ix_mv_ksa_kabupaten_kabupaten_tahun_bulan
+    ON mv_ksa_kabupaten (kabupaten, tahun, bulan);
+
+-- Per provinsi: jumlah kabupaten/kota per periode, lalu selisih yang sama
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_ksa_provinsi AS
+WITH periods AS (
+    SELECT
+        provinsi,
+        tahun,
+        bulan,
+        bulan_ke,
+        periode,
+        SUM(luas_panen)::BIGINT AS luas_panen,
+        SUM(produksi_beras)::BIGINT AS produksi_beras,
+        SUM(produksi_padi)::BIGINT AS produksi_padi
+    FROM mv_ksa_kabupaten
+    GROUP BY provinsi, tahun, bulan, bulan_ke, periode
+)
+SELECT
+    cur.provinsi,
+    cur.tahun,
+    cur.bulan,
+    cur.bulan_ke,
+    cur.periode,
+    cur.luas_panen,
+    cur.produksi_beras,
+    cur.produksi_padi,
+    cur.luas_panen - mom.luas_panen AS luas_panen_mom,
+    cur.produksi_beras - mom.produksi_beras AS produksi_beras_mom,
+    cur.produksi_padi - mom.produksi_padi AS produksi_padi_mom,
+    (cur.luas_panen - mom.luas_panen)::DOUBLE PRECISION / NULLIF(mom.luas_panen, 0) * 100 AS luas_panen_mom_pct,
+    (cur.produksi_beras - mom.produksi_beras)::DOUBLE PRECISION / NULLIF(mom.produksi_beras, 0) * 100 AS produksi_beras_mom_pct,
+    (cur.produksi_padi - mom.produksi_padi)::DOUBLE PRECISION / NULLIF(mom.produksi_padi, 0) * 100 AS produksi_padi_mom_pct,
+    cur.luas_panen - yoy.luas_panen AS luas_panen_yoy,
+    cur.produksi_beras - yoy.produksi_beras AS produksi_beras_yoy,
+    cur.produksi_padi - yoy.produksi_padi AS produksi_padi_yoy,
+    (cur.luas_panen - yoy.luas_panen)::DOUBLE PRECISION / NULLIF(yoy.luas_panen, 0) * 100 AS luas_panen_yoy_pct,
+    (cur.produksi_beras - yoy.produksi_beras)::DOUBLE PRECISION / NULLIF(yoy.produksi_beras, 0) * 100 AS produksi_beras_yoy_pct,
+    (cur.produksi_padi - yoy.produksi_padi)::DOUBLE PRECISION / NULLIF(yoy.produksi_padi, 0) * 100 AS produksi_padi_yoy_pct
+FROM periods cur
+LEFT JOIN periods mom
+    ON mom.provinsi = cur.provinsi AND mom.periode = cur.periode - 1
+LEFT JOIN periods yoy
+    ON yoy.provinsi = cur.provinsi AND yoy.periode = cur.periode - 12;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_ksa_provinsi
+    ON mv_ksa_provinsi (provinsi, periode);
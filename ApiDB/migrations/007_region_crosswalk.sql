@@ -0,0 +1,18 @@
+-- 007: Padanan nama wilayah SIMOTANDI (data_panen) dengan nama wilayah KSA (data_ksa)
+-- Diisi ulang oleh insert_data.py setiap ingest; id dipakai sebagai kunci integer untuk join.
+
+CREATE TABLE IF NOT EXISTS region_crosswalk (
+    id SERIAL PRIMARY KEY,
+    level VARCHAR NOT NULL,
+    panen_provinsi VARCHAR NOT NULL,
+    panen_kabupaten VARCHAR NOT NULL,
+    ksa_provinsi VARCHAR NOT NULL,
+    ksa_kabupaten VARCHAR NOT NULL,
+    metode VARCHAR NOT NULL
+);
+
+-- level 'provinsi' memakai '-' untuk kabupaten, seperti baris agregat data_panen
+CREATE UNIQUE INDEX IF NOT EXISTS ux_region_crosswalk_panen
+    ON region_crosswalk (level, panen_provinsi, panen_kabupaten);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_region_crosswalk_ksa
+    ON region_crosswalk (level, ksa_provinsi, ksa_kabupaten);
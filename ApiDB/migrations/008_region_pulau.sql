@@ -0,0 +1,57 @@
+-- 008: Dimensi pulau per provinsi, dipakai untuk group_by=pulau di semua endpoint
+-- Berisi semua ejaan provinsi dari data_panen, data_iklim dan data_ksa; dicocokkan tanpa membedakan huruf besar/kecil.
+
+CREATE TABLE IF NOT EXISTS region_pulau (
+    provinsi VARCHAR PRIMARY KEY,
+    pulau VARCHAR NOT NULL
+);
+
+INSERT INTO region_pulau (provinsi, pulau) VALUES
+    ('Aceh', 'Sumatera'),
+    ('Sumatera Utara', 'Sumatera'),
+    ('Sumatera Barat', 'Sumatera'),
+    ('Riau', 'Sumatera'),
+    ('Kepulauan Riau', 'Sumatera'),
+    ('Jambi', 'Sumatera'),
+    ('Bengkulu', 'Sumatera'),
+    ('Lampung', 'Sumatera'),
+    ('Sumatera Selatan', 'Sumatera'),
+    ('Bangka Belitung', 'Sumatera'),
+    ('Kepulauan Bangka Belitung', 'Sumatera'),
+
+    ('Banten', 'Jawa'),
+    ('DKI Jakarta', 'Jawa'),
+    ('Jawa Barat', 'Jawa'),
+    ('Jawa Tengah', 'Jawa'),
+    ('DI Yogyakarta', 'Jawa'),
+    ('Jawa Timur', 'Jawa'),
+
+    ('Bali', 'Bali & Nusa Tenggara'),
+    ('NTB', 'Bali & Nusa Tenggara'),
+    ('Nusa Tenggara Barat', 'Bali & Nusa Tenggara'),
+    ('NTT', 'Bali & Nusa Tenggara'),
+    ('Nusa Tenggara Timur', 'Bali & Nusa Tenggara'),
+
+    ('Kalimantan Barat', 'Kalimantan'),
+    ('Kalimantan Tengah', 'Kalimantan'),
+    ('Kalimantan Selatan', 'Kalimantan'),
+    ('Kalimantan Timur', 'Kalimantan'),
+    ('Kalimantan Utara', 'Kalimantan'),
+
+    ('Sulawesi Utara', 'Sulawesi'),
+    ('Sulawesi Tengah', 'Sulawesi'),
+    ('Sulawesi Selatan', 'Sulawesi'),
+    ('Sulawesi Tenggara', 'Sulawesi'),
+    ('Sulawesi Barat', 'Sulawesi'),
+    ('Gorontalo', 'Sulawesi'),
+
+    ('Maluku', 'Maluku & Papua'),
+    ('Maluku Utara', 'Maluku & Papua'),
+    ('Papua', 'Maluku & Papua'),
+    ('Papua Barat', 'Maluku & Papua'),
+    ('Papua Barat Daya', 'Maluku & Papua'),
+    ('Papua Selatan', 'Maluku & Papua'),
+    ('Papua Tengah', 'Maluku & Papua'),
+    ('Papua Pegunungan', 'Maluku & Papua'),
+    ('Papua Pengunungan', 'Maluku & Papua')
+ON CONFLICT (provinsi) DO NOTHING;
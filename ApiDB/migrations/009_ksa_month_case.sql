@@ -0,0 +1,9 @@
+-- 009: Nama bulan KSA disimpan dalam bentuk baku ('Maret', bukan 'MARET' atau 'maret')
+-- array_position di 006 peka huruf besar, sehingga baris dengan ejaan lain mendapat bulan_ke
+-- NULL dan hilang dari view tanpa pesan. insert_data.py menormalkan bulan saat ingest; baris
+-- yang sudah ada dinormalkan di sini, lalu view di-refresh.
+
+UPDATE data_ksa SET bulan = initcap(bulan) WHERE bulan IS DISTINCT FROM initcap(bulan);
+
+REFRESH MATERIALIZED VIEW mv_ksa_kabupaten;
+REFRESH MATERIALIZED VIEW mv_ksa_provinsi;
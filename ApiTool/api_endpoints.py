@@ -3,17 +3,22 @@ FastAPI REST API for Agricultural Data Analysis Tools.
 This API exposes all database tools as RESTful endpoints.
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Literal, NamedTuple
+import asyncio
+import logging
+import os
 import pandas as pd
-import json
+import orjson
 
 # Import all utility functions
 from utils import (
     get_data_nasional,
     get_parent_data,
+    get_region_names,
     get_data_panen,
     get_total_data_panen,
     get_wilayah_panen_tertinggi,
@@ -25,8 +30,43 @@ from utils import (
     chart_two,
     chart_three,
     chart_four,
-    chart_five
+    chart_five,
+    resolve_region,
+    iter_data_panen,
+    page_data_panen,
+    rank_regions,
+    get_rollup,
+    get_climate_series,
+    CLIMATE_GROUPS,
+    get_ksa_periods,
+    ksa_period,
+    KSA_LEVELS,
+    PULAU_GROUP,
+    get_total_data_panen_by_pulau,
+    get_efektifitas_alsintan_by_pulau,
+    get_data_ksa_by_pulau,
+    get_data_iklim_by_pulau,
+    snapshot
 )
+from executor import run_blocking, shutdown_executor
+from database import RequestConnection, request_connection, get_pool_status, get_data_version
+from cache import response_cache, etag_matches
+from gazetteer import normalize_name
+from climate import BULAN, month_index
+
+# How often to check the data version marker written by insert_data.py
+DATA_VERSION_POLL_SECONDS = float(os.getenv("DATA_VERSION_POLL_SECONDS", "30"))
+
+# Rows fetched from the server-side cursor per chunk in ?stream=ndjson mode
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+
+# Largest page size accepted by /api/data/panen
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "1000"))
+
+# Maximum number of items accepted by /api/batch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+
+logger = logging.getLogger(__name__)
 
 # Create FastAPI app
 app = FastAPI(
@@ -55,30 +95,316 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Share one pooled connection between all helpers used by a request
+@app.middleware("http")
+async def request_connection_scope(request: Request, call_next):
+    """Check out at most one database connection per request."""
+    holder = RequestConnection()
+    token = request_connection.set(holder)
+    try:
+        return await call_next(request)
+    finally:
+        request_connection.reset(token)
+        if holder.is_open:
+            await run_blocking(holder.close)
+
+async def reload_data():
+    """Reload the snapshot and start a fresh response cache for the current data version."""
+    # Read the version first so data ingested during the load is picked up by the next poll
+    version = await run_blocking(get_data_version)
+    await run_blocking(snapshot.load)
+    response_cache.reset(version)
+
+async def watch_data_version():
+    """Reload the snapshot and clear the cache whenever insert_data.py bumps the version."""
+    while True:
+        await asyncio.sleep(DATA_VERSION_POLL_SECONDS)
+        try:
+            version = await run_blocking(get_data_version)
+            if version is not None and version != response_cache.data_version:
+                await reload_data()
+        except Exception as e:
+            logger.warning("Data version check failed: %s", e)
+
+# Load the in-memory snapshot once so the first request does not pay for it
+@app.on_event("startup")
+async def load_snapshot():
+    """Load all tables into the in-memory snapshot and start watching the data version."""
+    try:
+        await reload_data()
+    except Exception as e:
+        # The snapshot is loaded lazily on first use if the database is not ready yet
+        logger.warning("Snapshot load deferred: %s", e)
+    app.state.data_version_watcher = asyncio.create_task(watch_data_version())
+
+@app.on_event("shutdown")
+async def stop_executor():
+    """Stop the data version watcher and release the worker threads."""
+    watcher = getattr(app.state, "data_version_watcher", None)
+    if watcher is not None:
+        watcher.cancel()
+    shutdown_executor()
+
 # Request/Response Models
 class RegionRequest(BaseModel):
     region: str
 
+class GroupedRegionRequest(RegionRequest):
+    group_by: Optional[str] = None
+
+class NumericRange(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+class PanenQueryRequest(RegionRequest):
+    limit: Optional[int] = None
+    sort: str = "id"
+    order: Literal["asc", "desc"] = "asc"
+    cursor: Optional[int] = None
+    columns: Optional[List[str]] = None
+    filters: Dict[str, NumericRange] = {}
+
+class RankRequest(RegionRequest):
+    region: str = "indonesia"
+    metric: str = "panen"
+    level: Optional[str] = None
+    k: int = 10
+    order: Literal["asc", "desc"] = "desc"
+    per_parent: bool = False
+
 class ClimateRequest(BaseModel):
     region: str
     month: Optional[str] = "September"
+    group_by: Optional[str] = None
+
+class ClimateSeriesRequest(RegionRequest):
+    region: str = "indonesia"
+    start: Optional[str] = None
+    end: Optional[str] = None
+    group_by: Optional[str] = None
+    agg: Literal["sum", "mean"] = "sum"
+
+class KsaPeriodsRequest(RegionRequest):
+    region: str = "indonesia"
+    start: Optional[str] = None
+    end: Optional[str] = None
+    level: Optional[str] = None
 
 class ApiResponse(BaseModel):
     success: bool
     data: Any
     message: Optional[str] = None
 
-# Utility function to convert DataFrame to JSON-serializable format
+class BatchItem(BaseModel):
+    operation: str
+    region: str = "indonesia"
+    params: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
+# Response encoding. DataFrames are written straight to JSON bytes with orjson instead of
+# being re-validated through ApiResponse; ?format=columnar selects the compact layout.
+# Bulk table endpoints can also answer with Arrow IPC or Parquet.
+COLUMNAR_FORMAT = "columnar"
+ARROW_FORMAT = "arrow"
+PARQUET_FORMAT = "parquet"
+BINARY_MEDIA_TYPES = {
+    ARROW_FORMAT: "application/vnd.apache.arrow.stream",
+    PARQUET_FORMAT: "application/vnd.apache.parquet",
+}
+
 def df_to_json(df):
-    """Convert DataFrame to JSON-serializable format."""
+    """Convert DataFrame to a list of row dicts (NaN is encoded as null)."""
     if df is None or df.empty:
         return []
-    
-    # Replace NaN values with None for JSON serialization
-    df_cleaned = df.where(pd.notnull(df), None)
-    return df_cleaned.to_dict(orient='records')
+
+    columns = list(df.columns)
+    values = [df.iloc[:, position].tolist() for position in range(len(columns))]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+def df_to_columns(df):
+    """Convert DataFrame to the columnar ``{"columns": [...], "data": [[...]]}`` layout."""
+    if df is None:
+        return {"columns": [], "data": []}
+
+    columns = list(df.columns)
+    values = [df.iloc[:, position].tolist() for position in range(len(columns))]
+    return {"columns": columns, "data": [list(row) for row in zip(*values)]}
+
+def df_to_binary(df, layout: str) -> bytes:
+    """Encode a DataFrame as an Arrow IPC stream or a Parquet file, column by column."""
+    # pyarrow is only needed for these formats, so it is not imported at startup
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    if not isinstance(df, pd.DataFrame):
+        df = pd.DataFrame()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if layout == PARQUET_FORMAT:
+        pq.write_table(table, sink)
+    else:
+        with ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def frame_payload(df):
+    """Pass a DataFrame through to the encoder, or an empty list when there is none."""
+    return [] if df is None else df
+
+def render_json(content, columnar: bool = False) -> bytes:
+    """Encode content with orjson, writing DataFrames as records or columns."""
+    encode_frame = df_to_columns if columnar else df_to_json
+
+    def default(value):
+        if isinstance(value, pd.DataFrame):
+            return encode_frame(value)
+        if value is pd.NA or value is pd.NaT:
+            return None
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+    return orjson.dumps(content, default=default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+def response_format(http_request: Request, binary: bool = False) -> Optional[str]:
+    """Layout the caller asked for: None for JSON records, columnar, or arrow/parquet for bulk tables."""
+    requested = http_request.query_params.get("format")
+    if binary:
+        if requested in BINARY_MEDIA_TYPES:
+            return requested
+        accept = http_request.headers.get("accept", "")
+        for layout, media_type in BINARY_MEDIA_TYPES.items():
+            if media_type in accept:
+                return layout
+    return COLUMNAR_FORMAT if requested == COLUMNAR_FORMAT else None
+
+def cache_key(path: str, layout: Optional[str], *args, group_by: Optional[str] = None) -> str:
+    """Response cache key for ``path`` in the given layout and grouping."""
+    if group_by is not None:
+        path = f"{path}?group_by={group_by}"
+    if layout is not None:
+        path = f"{path}{'&' if '?' in path else '?'}format={layout}"
+    return response_cache.key(path, *args)
+
+def encode_result(result, layout: Optional[str]) -> bytes:
+    """Encode a converted result in the given layout."""
+    if layout in BINARY_MEDIA_TYPES:
+        return df_to_binary(result, layout)
+    return render_json(result, layout == COLUMNAR_FORMAT)
+
+async def cached_response(http_request: Request, message: str, func: Callable, *args, convert: Callable = frame_payload, binary: bool = False, group_by: Optional[str] = None) -> Response:
+    """Answer from the response cache, computing ``convert(func(*args))`` on a miss.
+
+    Blocking functions run in the worker pool; coroutine functions are awaited directly.
+    With ``binary`` the single table result may also be sent as Arrow IPC or Parquet.
+
+    The first argument is treated as the region and the second as the month; ``group_by``
+    keeps grouped results apart from the ungrouped ones. Responses carry an ETag tied to
+    the data version, and a matching If-None-Match gets a 304.
+    """
+    layout = response_format(http_request, binary)
+    key = cache_key(http_request.url.path, layout, *args, group_by=group_by)
+    tag = response_cache.tag
+    etag = response_cache.etag(key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if binary:
+        headers["Vary"] = "Accept"
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    data = response_cache.get(key)
+    if data is None:
+        if asyncio.iscoroutinefunction(func):
+            result = convert(await func(*args))
+            data = await run_blocking(encode_result, result, layout)
+        else:
+            data = await run_blocking(lambda: encode_result(convert(func(*args)), layout))
+        response_cache.set(key, data, tag)
+
+    if layout in BINARY_MEDIA_TYPES:
+        return Response(content=data, media_type=BINARY_MEDIA_TYPES[layout], headers=headers)
+
+    # The message echoes the caller's spelling of the region, so only the data is cached
+    body = b'{"success":true,"data":' + data + b',"message":' + render_json(message) + b'}'
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Streaming mode for large row sets
+NDJSON_STREAM = "ndjson"
+
+async def ndjson_response(user_input: str) -> StreamingResponse:
+    """Stream a region's data_panen rows as NDJSON, one chunk of the DB cursor at a time."""
+    parent_data = (await run_blocking(resolve_region, user_input)).parent
+    chunks = iter_data_panen(parent_data, STREAM_CHUNK_SIZE)
+
+    def next_chunk() -> Optional[bytes]:
+        rows = next(chunks, None)
+        if rows is None:
+            return None
+        return b"".join(orjson.dumps(dict(row)) + b"\n" for row in rows)
+
+    async def body():
+        try:
+            while True:
+                data = await run_blocking(next_chunk)
+                if data is None:
+                    break
+                yield data
+        finally:
+            try:
+                chunks.close()
+            except ValueError:
+                # Still fetching in a worker after a disconnect; it is closed when collected
+                pass
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+# Parameterized queries (pagination, ranking)
+def query_ranges(http_request: Request) -> Dict[str, tuple]:
+    """Numeric range filters given as ``min_<column>``/``max_<column>`` query parameters."""
+    ranges: Dict[str, list] = {}
+    for name, value in http_request.query_params.items():
+        bound, _, column = name.partition("_")
+        if bound in ("min", "max") and column:
+            try:
+                number = float(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"{name} must be a number")
+            ranges.setdefault(column, [None, None])[0 if bound == "min" else 1] = number
+    return {column: tuple(bounds) for column, bounds in ranges.items()}
+
+PAGE_PARAMETERS = ("limit", "sort", "order", "cursor", "columns")
+STREAM_PARAMETERS_ERROR = "Limit, range filters, columns, sort, order and cursor cannot be combined with stream"
+
+def check_stream_parameters(http_request: Request):
+    """Reject page and range parameters on an NDJSON stream, which always carries every row."""
+    given = [name for name in PAGE_PARAMETERS if name in http_request.query_params]
+    if given or query_ranges(http_request):
+        raise HTTPException(
+            status_code=400,
+            detail=STREAM_PARAMETERS_ERROR,
+        )
+
+async def query_response(http_request: Request, message: str, func: Callable, *args, **kwargs) -> Response:
+    """Run a parameterized query in the worker pool; invalid parameters (ValueError) are a 400."""
+    try:
+        result = await run_blocking(func, *args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    columnar = response_format(http_request) == COLUMNAR_FORMAT
+    content = {"success": True, "data": frame_payload(result), "message": message}
+    return Response(content=await run_blocking(render_json, content, columnar), media_type="application/json")
 
 # API Endpoints
+# group_by values accepted by the totals, alsintan, KSA and climate endpoints
+GROUP_BY_VALUES = (PULAU_GROUP,)
+
+def check_group_by(group_by: Optional[str]):
+    """Reject an unknown group_by with a 400."""
+    if group_by is not None and group_by not in GROUP_BY_VALUES:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by '{group_by}', use one of: {', '.join(GROUP_BY_VALUES)}")
+
 @app.get("/", response_model=Dict[str, str])
 async def root():
     """Root endpoint with API information."""
@@ -96,33 +422,38 @@ async def health_check():
 
 # 1. National Data Endpoint
 @app.get("/api/data/nasional", response_model=ApiResponse)
-async def api_get_data_nasional():
+async def api_get_data_nasional(http_request: Request):
     """Get national level agricultural data."""
     try:
-        df = get_data_nasional()
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message="National data retrieved successfully"
-        )
+        return await cached_response(http_request, "National data retrieved successfully", get_data_nasional)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # 2. Parent Data Endpoint
 @app.get("/api/data/parent", response_model=ApiResponse)
 @app.post("/api/data/parent", response_model=ApiResponse)
-async def api_get_parent_data(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+async def api_get_parent_data(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
     """Get parent data information for a given region."""
     try:
         input_region = request.region if request else region
         if not input_region:
             raise HTTPException(status_code=400, detail="Region parameter is required")
         
-        result = get_parent_data(input_region)
-        return ApiResponse(
-            success=True,
-            data=result,
-            message="Parent data retrieved successfully"
+        return await cached_response(
+            http_request, "Parent data retrieved successfully",
+            get_parent_data, input_region, convert=lambda result: result
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Region names, for matching regions in free text
+@app.get("/api/data/regions", response_model=ApiResponse)
+async def api_get_region_names(http_request: Request):
+    """Get every provinsi, kota and kabupaten name."""
+    try:
+        return await cached_response(
+            http_request, "Region names retrieved successfully",
+            get_region_names, convert=lambda result: result
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -130,37 +461,82 @@ async def api_get_parent_data(request: Optional[RegionRequest] = None, region: s
 # 3. Agricultural Data by Region
 @app.get("/api/data/panen", response_model=ApiResponse)
 @app.post("/api/data/panen", response_model=ApiResponse)
-async def api_get_data_panen(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
-    """Get agricultural data based on region input."""
+async def api_get_data_panen(
+    http_request: Request,
+    request: Optional[PanenQueryRequest] = None,
+    region: str = Query(default="indonesia"),
+    stream: Optional[str] = Query(default=None),
+    limit: Optional[int] = Query(default=None),
+    sort: str = Query(default="id"),
+    order: Literal["asc", "desc"] = Query(default="asc"),
+    cursor: Optional[int] = Query(default=None),
+    columns: Optional[str] = Query(default=None),
+):
+    """Get agricultural data based on region input.
+
+    With ``limit`` the rows come back one keyset page at a time, optionally sorted by a
+    numeric column, projected to ``columns`` and filtered with numeric ranges
+    (``min_<column>``/``max_<column>`` query parameters or ``filters`` in the body).
+    """
     try:
         input_region = request.region if request else region
         if not input_region:
             raise HTTPException(status_code=400, detail="Region parameter is required")
         
-        df = get_data_panen(input_region)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"Agricultural data for {input_region} retrieved successfully"
+        if request:
+            limit, sort, order, cursor = request.limit, request.sort, request.order, request.cursor
+            selected = request.columns
+            ranges = {column: (bounds.min, bounds.max) for column, bounds in request.filters.items()}
+        else:
+            selected = [column.strip() for column in columns.split(",") if column.strip()] if columns else None
+            ranges = query_ranges(http_request)
+
+        # The stream and the full, cached response are never filtered, so these must not be silently dropped
+        paged = bool(ranges or selected) or cursor is not None or sort != "id" or order != "asc"
+        if stream == NDJSON_STREAM:
+            if limit is not None or paged:
+                raise HTTPException(
+                    status_code=400,
+                    detail=STREAM_PARAMETERS_ERROR,
+                )
+            return await ndjson_response(input_region)
+
+        if limit is None and paged:
+            raise HTTPException(
+                status_code=400,
+                detail="Range filters, columns, sort, order and cursor require limit",
+            )
+
+        if limit is not None:
+            return await query_response(
+                http_request, f"Page of agricultural data for {input_region} retrieved successfully",
+                page_data_panen, input_region, limit=min(limit, PAGE_MAX_LIMIT), sort=sort,
+                descending=order == "desc", after=cursor, columns=selected, ranges=ranges
+            )
+        return await cached_response(
+            http_request, f"Agricultural data for {input_region} retrieved successfully",
+            get_data_panen, input_region, binary=True
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # 4. Total Agricultural Data
 @app.get("/api/data/total-panen", response_model=ApiResponse)
 @app.post("/api/data/total-panen", response_model=ApiResponse)
-async def api_get_total_data_panen(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
-    """Get total agricultural data based on region input."""
+async def api_get_total_data_panen(http_request: Request, request: Optional[GroupedRegionRequest] = None, region: str = Query(default="indonesia"), group_by: Optional[str] = Query(default=None)):
+    """Get total agricultural data based on region input, optionally per pulau."""
+    group_by = request.group_by if request else group_by
+    check_group_by(group_by)
     try:
         input_region = request.region if request else region
         if not input_region:
             raise HTTPException(status_code=400, detail="Region parameter is required")
         
-        df = get_total_data_panen(input_region)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"Total agricultural data for {input_region} retrieved successfully"
+        return await cached_response(
+            http_request, f"Total agricultural data for {input_region} retrieved successfully",
+            get_total_data_panen_by_pulau if group_by else get_total_data_panen, input_region, group_by=group_by
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -168,18 +544,16 @@ async def api_get_total_data_panen(request: Optional[RegionRequest] = None, regi
 # 5. Highest Harvest Regions
 @app.get("/api/data/wilayah-panen-tertinggi", response_model=ApiResponse)
 @app.post("/api/data/wilayah-panen-tertinggi", response_model=ApiResponse)
-async def api_get_wilayah_panen_tertinggi(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+async def api_get_wilayah_panen_tertinggi(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
     """Get regions with highest harvest data."""
     try:
         input_region = request.region if request else region
         if not input_region:
             raise HTTPException(status_code=400, detail="Region parameter is required")
         
-        df = get_wilayah_panen_tertinggi(input_region)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"Highest harvest regions for {input_region} retrieved successfully"
+        return await cached_response(
+            http_request, f"Highest harvest regions for {input_region} retrieved successfully",
+            get_wilayah_panen_tertinggi, input_region
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -187,18 +561,19 @@ async def api_get_wilayah_panen_tertinggi(request: Optional[RegionRequest] = Non
 # 6. Agricultural Machinery Effectiveness
 @app.get("/api/data/efektifitas-alsintan", response_model=ApiResponse)
 @app.post("/api/data/efektifitas-alsintan", response_model=ApiResponse)
-async def api_get_wilayah_efektifitas_alsintan(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
-    """Get regions with highest agricultural machinery effectiveness."""
+async def api_get_wilayah_efektifitas_alsintan(http_request: Request, request: Optional[GroupedRegionRequest] = None, region: str = Query(default="indonesia"), group_by: Optional[str] = Query(default=None)):
+    """Get regions with highest agricultural machinery effectiveness, optionally per pulau."""
+    group_by = request.group_by if request else group_by
+    check_group_by(group_by)
     try:
         input_region = request.region if request else region
         if not input_region:
             raise HTTPException(status_code=400, detail="Region parameter is required")
         
-        df = get_wilayah_efektifitas_alsintan(input_region)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"Agricultural machinery effectiveness for {input_region} retrieved successfully"
+        return await cached_response(
+            http_request, f"Agricultural machinery effectiveness for {input_region} retrieved successfully",
+            get_efektifitas_alsintan_by_pulau if group_by else get_wilayah_efektifitas_alsintan, input_region,
+            group_by=group_by
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -206,18 +581,16 @@ async def api_get_wilayah_efektifitas_alsintan(request: Optional[RegionRequest]
 # 7. Summary Report
 @app.get("/api/data/ringkasan", response_model=ApiResponse)
 @app.post("/api/data/ringkasan", response_model=ApiResponse)
-async def api_get_prompt_ringkasan_data_panen(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+async def api_get_prompt_ringkasan_data_panen(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
     """Generate a summary report for agricultural data."""
     try:
         input_region = request.region if request else region
         if not input_region:
             raise HTTPException(status_code=400, detail="Region parameter is required")
         
-        summary = get_prompt_ringkasan_data_panen(input_region)
-        return ApiResponse(
-            success=True,
-            data={"summary": summary},
-            message=f"Summary report for {input_region} generated successfully"
+        return await cached_response(
+            http_request, f"Summary report for {input_region} generated successfully",
+            get_prompt_ringkasan_data_panen, input_region, convert=lambda summary: {"summary": summary}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -225,8 +598,10 @@ async def api_get_prompt_ringkasan_data_panen(request: Optional[RegionRequest] =
 # 8. Climate Data
 @app.get("/api/data/iklim", response_model=ApiResponse)
 @app.post("/api/data/iklim", response_model=ApiResponse)
-async def api_get_data_iklim(request: Optional[ClimateRequest] = None, region: str = Query(default="indonesia"), month: str = Query(default="September")):
-    """Get climate data based on region and month."""
+async def api_get_data_iklim(http_request: Request, request: Optional[ClimateRequest] = None, region: str = Query(default="indonesia"), month: str = Query(default="September"), group_by: Optional[str] = Query(default=None)):
+    """Get climate data based on region and month, optionally summed per pulau."""
+    group_by = request.group_by if request else group_by
+    check_group_by(group_by)
     try:
         if request:
             input_region = request.region
@@ -238,11 +613,44 @@ async def api_get_data_iklim(request: Optional[ClimateRequest] = None, region: s
         if not input_region:
             raise HTTPException(status_code=400, detail="Region parameter is required")
         
-        df = get_data_iklim(input_region, input_month)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"Climate data for {input_region} in {input_month} retrieved successfully"
+        return await cached_response(
+            http_request, f"Climate data for {input_region} in {input_month} retrieved successfully",
+            get_data_iklim_by_pulau if group_by else get_data_iklim, input_region, input_month, group_by=group_by
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 8b. Climate Time Series
+def climate_series_payload(result):
+    """The climate series, or an empty object for an unknown region."""
+    return {} if result is None else result
+
+@app.get("/api/data/iklim/series", response_model=ApiResponse)
+@app.post("/api/data/iklim/series", response_model=ApiResponse)
+async def api_get_climate_series(
+    http_request: Request,
+    request: Optional[ClimateSeriesRequest] = None,
+    region: str = Query(default="indonesia"),
+    start: Optional[str] = Query(default=None),
+    end: Optional[str] = Query(default=None),
+    group_by: Optional[str] = Query(default=None),
+    agg: Literal["sum", "mean"] = Query(default="sum"),
+):
+    """Get climate readings for every month of a range in one call, per station or aggregated."""
+    if request:
+        region, start, end, group_by, agg = request.region, request.start, request.end, request.group_by, request.agg
+    if group_by is not None and group_by not in CLIMATE_GROUPS:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by '{group_by}', use one of: {', '.join(CLIMATE_GROUPS)}")
+    try:
+        # Month names as the cache key, so "3", "mar" and "Maret" share one entry
+        start, end = (None if month is None else BULAN[month_index(month)] for month in (start, end))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await cached_response(
+            http_request, f"Climate series for {region} retrieved successfully",
+            get_climate_series, region, start, end, group_by, agg,
+            convert=climate_series_payload
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -250,18 +658,48 @@ async def api_get_data_iklim(request: Optional[ClimateRequest] = None, region: s
 # 9. KSA Data
 @app.get("/api/data/ksa", response_model=ApiResponse)
 @app.post("/api/data/ksa", response_model=ApiResponse)
-async def api_get_data_ksa(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
-    """Get KSA (agricultural statistics) data based on region."""
+async def api_get_data_ksa(http_request: Request, request: Optional[GroupedRegionRequest] = None, region: str = Query(default="indonesia"), group_by: Optional[str] = Query(default=None)):
+    """Get KSA (agricultural statistics) data based on region, optionally summed per pulau."""
+    group_by = request.group_by if request else group_by
+    check_group_by(group_by)
     try:
         input_region = request.region if request else region
         if not input_region:
             raise HTTPException(status_code=400, detail="Region parameter is required")
         
-        df = get_data_ksa(input_region)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"KSA data for {input_region} retrieved successfully"
+        return await cached_response(
+            http_request, f"KSA data for {input_region} retrieved successfully",
+            get_data_ksa_by_pulau if group_by else get_data_ksa, input_region, binary=True, group_by=group_by
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 9b. KSA Periods
+@app.get("/api/data/ksa/periods", response_model=ApiResponse)
+@app.post("/api/data/ksa/periods", response_model=ApiResponse)
+async def api_get_ksa_periods(
+    http_request: Request,
+    request: Optional[KsaPeriodsRequest] = None,
+    region: str = Query(default="indonesia"),
+    start: Optional[str] = Query(default=None),
+    end: Optional[str] = Query(default=None),
+    level: Optional[str] = Query(default=None),
+):
+    """Get KSA data for a range of months with month-over-month and year-over-year deltas."""
+    if request:
+        region, start, end, level = request.region, request.start, request.end, request.level
+    if level is not None and level not in KSA_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level '{level}', use one of: {', '.join(KSA_LEVELS)}")
+    try:
+        periods = [None if period is None else ksa_period(period) for period in (start, end)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # YYYY-MM as the cache key, so "2025-1", "2025-01" and "Januari 2025" share one entry
+    start, end = (None if period is None else f"{period // 12}-{period % 12 + 1:02d}" for period in periods)
+    try:
+        return await cached_response(
+            http_request, f"KSA periods for {region} retrieved successfully",
+            get_ksa_periods, region, start, end, level, binary=True
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -270,15 +708,13 @@ async def api_get_data_ksa(request: Optional[RegionRequest] = None, region: str
 # 10. Chart One - Climate Visualization
 @app.get("/api/charts/climate")
 @app.post("/api/charts/climate", response_model=ApiResponse)
-async def api_chart_one(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+async def api_chart_one(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
     """Generate chart data for climate visualization."""
     try:
         input_region = request.region if request else region
-        df = chart_one(input_region)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"Climate chart data for {input_region} generated successfully"
+        return await cached_response(
+            http_request, f"Climate chart data for {input_region} generated successfully",
+            chart_one, input_region
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -286,34 +722,35 @@ async def api_chart_one(request: Optional[RegionRequest] = None, region: str = Q
 # 11. Chart Two - Harvest Regions
 @app.get("/api/charts/harvest-regions")
 @app.post("/api/charts/harvest-regions", response_model=ApiResponse)
-async def api_chart_two(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+async def api_chart_two(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
     """Generate chart data for harvest regions visualization."""
     try:
         input_region = request.region if request else region
-        df = chart_two(input_region)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"Harvest regions chart data for {input_region} generated successfully"
+        return await cached_response(
+            http_request, f"Harvest regions chart data for {input_region} generated successfully",
+            chart_two, input_region
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # 12. Chart Three - Harvest vs KSA Comparison
+def harvest_vs_ksa_payload(frames):
+    """Both top-10 lists plus the region-by-region comparison joined on the crosswalk."""
+    return {
+        "harvest_data": frame_payload(frames[0]),
+        "ksa_data": frame_payload(frames[1]),
+        "comparison": frame_payload(frames[2])
+    }
+
 @app.get("/api/charts/harvest-vs-ksa")
 @app.post("/api/charts/harvest-vs-ksa", response_model=ApiResponse)
-async def api_chart_three(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+async def api_chart_three(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
     """Generate chart data for harvest vs KSA comparison."""
     try:
         input_region = request.region if request else region
-        df_panen, df_ksa = chart_three(input_region)
-        return ApiResponse(
-            success=True,
-            data={
-                "harvest_data": df_to_json(df_panen),
-                "ksa_data": df_to_json(df_ksa)
-            },
-            message=f"Harvest vs KSA comparison data for {input_region} generated successfully"
+        return await cached_response(
+            http_request, f"Harvest vs KSA comparison data for {input_region} generated successfully",
+            chart_three, input_region, convert=harvest_vs_ksa_payload
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -321,15 +758,13 @@ async def api_chart_three(request: Optional[RegionRequest] = None, region: str =
 # 13. Chart Four - Agricultural Machinery Effectiveness
 @app.get("/api/charts/machinery-effectiveness")
 @app.post("/api/charts/machinery-effectiveness", response_model=ApiResponse)
-async def api_chart_four(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+async def api_chart_four(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
     """Generate chart data for agricultural machinery effectiveness."""
     try:
         input_region = request.region if request else region
-        df = chart_four(input_region)
-        return ApiResponse(
-            success=True,
-            data=df_to_json(df),
-            message=f"Machinery effectiveness chart data for {input_region} generated successfully"
+        return await cached_response(
+            http_request, f"Machinery effectiveness chart data for {input_region} generated successfully",
+            chart_four, input_region
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -337,19 +772,242 @@ async def api_chart_four(request: Optional[RegionRequest] = None, region: str =
 # 14. Chart Five - General Agricultural Data
 @app.get("/api/charts/general-data")
 @app.post("/api/charts/general-data", response_model=ApiResponse)
-async def api_chart_five(request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+async def api_chart_five(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia"), stream: Optional[str] = Query(default=None)):
     """Generate chart data for general agricultural data."""
     try:
         input_region = request.region if request else region
-        df = chart_five(input_region)
+        if stream == NDJSON_STREAM:
+            check_stream_parameters(http_request)
+            return await ndjson_response(input_region)
+        return await cached_response(
+            http_request, f"General agricultural chart data for {input_region} generated successfully",
+            chart_five, input_region, binary=True
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Ranking Endpoint
+@app.get("/api/rank", response_model=ApiResponse)
+@app.post("/api/rank", response_model=ApiResponse)
+async def api_rank(
+    http_request: Request,
+    request: Optional[RankRequest] = None,
+    region: str = Query(default="indonesia"),
+    metric: str = Query(default="panen"),
+    level: Optional[str] = Query(default=None),
+    k: int = Query(default=10),
+    order: Literal["asc", "desc"] = Query(default="desc"),
+    per_parent: bool = Query(default=False),
+):
+    """Top-k regions by any metric or ratio, at any level, overall or within each parent."""
+    if request:
+        region, metric, level, k, order, per_parent = (
+            request.region, request.metric, request.level, request.k, request.order, request.per_parent
+        )
+    try:
+        return await query_response(
+            http_request, f"Top {k} regions by {metric} for {region} retrieved successfully",
+            rank_regions, region, metric=metric, level=level, k=min(k, PAGE_MAX_LIMIT),
+            descending=order == "desc", per_parent=per_parent
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Rollup Drill-down Endpoint
+def rollup_payload(result):
+    """The rolled-up node and its children, or an empty object for an unknown region."""
+    return {} if result is None else result
+
+@app.get("/api/rollup", response_model=ApiResponse)
+@app.post("/api/rollup", response_model=ApiResponse)
+async def api_rollup(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+    """Totals of a region and of each region directly below it, from the precomputed rollup."""
+    try:
+        input_region = request.region if request else region
+        return await cached_response(
+            http_request, f"Rollup for {input_region} retrieved successfully",
+            get_rollup, input_region, convert=rollup_payload
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Batch Endpoint
+class BatchOperation(NamedTuple):
+    """An analysis available to /api/batch, cached under its single-item endpoint path."""
+    path: str
+    func: Callable
+    convert: Callable = frame_payload
+    params: Dict[str, Any] = {}
+
+BATCH_OPERATIONS = {
+    "parent": BatchOperation("/api/data/parent", lambda ctx: ctx.parent, lambda result: result),
+    "panen": BatchOperation("/api/data/panen", get_data_panen),
+    "total-panen": BatchOperation("/api/data/total-panen", get_total_data_panen),
+    "wilayah-panen-tertinggi": BatchOperation("/api/data/wilayah-panen-tertinggi", get_wilayah_panen_tertinggi),
+    "efektifitas-alsintan": BatchOperation("/api/data/efektifitas-alsintan", get_wilayah_efektifitas_alsintan),
+    "ringkasan": BatchOperation("/api/data/ringkasan", get_prompt_ringkasan_data_panen, lambda summary: {"summary": summary}),
+    "iklim": BatchOperation("/api/data/iklim", get_data_iklim, params={"month": "September"}),
+    "ksa": BatchOperation("/api/data/ksa", get_data_ksa),
+    "climate": BatchOperation("/api/charts/climate", chart_one),
+    "harvest-regions": BatchOperation("/api/charts/harvest-regions", chart_two),
+    "harvest-vs-ksa": BatchOperation("/api/charts/harvest-vs-ksa", chart_three, harvest_vs_ksa_payload),
+    "machinery-effectiveness": BatchOperation("/api/charts/machinery-effectiveness", chart_four),
+    "general-data": BatchOperation("/api/charts/general-data", chart_five),
+    "rollup": BatchOperation("/api/rollup", get_rollup, rollup_payload),
+}
+
+def batch_result(operation: str, region: str, data: Optional[bytes] = None, error: Optional[str] = None) -> bytes:
+    """Encode one /api/batch result around already rendered data."""
+    header = render_json({"operation": operation, "region": region})[:-1]
+    if error is not None:
+        return header + b',"success":false,"error":' + render_json(error) + b'}'
+    return header + b',"success":true,"data":' + data + b'}'
+
+def run_batch_items(items: List[tuple], columnar: bool = False) -> List[tuple]:
+    """Run (operation, region, args) items, resolving and loading each distinct region once."""
+    contexts = {}
+    results = []
+    for operation, region, args in items:
+        try:
+            region_key = normalize_name(region)
+            if region_key not in contexts:
+                contexts[region_key] = resolve_region(region)
+            result = operation.convert(operation.func(contexts[region_key], *args))
+            results.append((render_json(result, columnar), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+@app.post("/api/batch", response_model=ApiResponse)
+async def api_batch(http_request: Request, request: BatchRequest):
+    """Run many analyses for many regions in one call."""
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items are allowed per batch")
+
+    try:
+        tag = response_cache.tag
+        results: List[Optional[bytes]] = [None] * len(request.items)
+        pending: Dict[str, tuple] = {}
+        waiting: Dict[str, List[int]] = {}
+        for index, item in enumerate(request.items):
+            operation = BATCH_OPERATIONS.get(item.operation)
+            if operation is None:
+                results[index] = batch_result(item.operation, item.region, error=f"Unknown operation '{item.operation}'")
+                continue
+
+            args = [item.params.get(name, default) for name, default in operation.params.items()]
+            key = cache_key(operation.path, response_format(http_request), item.region, *args)
+            data = None if key in pending else response_cache.get(key)
+            if data is None:
+                pending.setdefault(key, (operation, item.region, args))
+                waiting.setdefault(key, []).append(index)
+            else:
+                results[index] = batch_result(item.operation, item.region, data)
+
+        # All cache misses run together so shared regions are resolved and loaded once
+        if pending:
+            columnar = response_format(http_request) == COLUMNAR_FORMAT
+            computed = await run_blocking(run_batch_items, list(pending.values()), columnar)
+            for key, (data, error) in zip(pending, computed):
+                if error is None:
+                    response_cache.set(key, data, tag)
+                for index in waiting[key]:
+                    item = request.items[index]
+                    results[index] = batch_result(item.operation, item.region, data, error)
+
+        message = render_json(f"Batch of {len(results)} items processed")
+        body = b'{"success":true,"data":[' + b','.join(results) + b'],"message":' + message + b'}'
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Dashboard Endpoint
+DASHBOARD_SECTIONS = {
+    "climate": BATCH_OPERATIONS["climate"],
+    "harvest_regions": BATCH_OPERATIONS["harvest-regions"],
+    "harvest_vs_ksa": BATCH_OPERATIONS["harvest-vs-ksa"],
+    "machinery_effectiveness": BATCH_OPERATIONS["machinery-effectiveness"],
+    "general_data": BATCH_OPERATIONS["general-data"],
+}
+
+def load_region_context(region: str):
+    """Resolve a region and load its data_panen rows so concurrent sections can share them."""
+    ctx = resolve_region(region)
+    ctx.data_panen
+    return ctx
+
+async def build_dashboard(region: str) -> Dict[str, Any]:
+    """Build the parent data and every chart payload from one shared region load."""
+    ctx = await run_blocking(load_region_context, region)
+    sections = await asyncio.gather(*(
+        run_blocking(lambda section=section: section.convert(section.func(ctx)))
+        for section in DASHBOARD_SECTIONS.values()
+    ))
+    return {"parent": ctx.parent, **dict(zip(DASHBOARD_SECTIONS, sections))}
+
+@app.get("/api/dashboard", response_model=ApiResponse)
+@app.post("/api/dashboard", response_model=ApiResponse)
+async def api_dashboard(http_request: Request, request: Optional[RegionRequest] = None, region: str = Query(default="indonesia")):
+    """Get the parent data and all five chart payloads for a region in one response."""
+    try:
+        input_region = request.region if request else region
+        if not input_region:
+            raise HTTPException(status_code=400, detail="Region parameter is required")
+
+        return await cached_response(
+            http_request, f"Dashboard data for {input_region} generated successfully",
+            build_dashboard, input_region, convert=lambda dashboard: dashboard
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Snapshot Endpoints
+@app.get("/api/snapshot", response_model=ApiResponse)
+async def api_snapshot_stats():
+    """Describe the in-memory data snapshot."""
+    return ApiResponse(
+        success=True,
+        data=snapshot.stats(),
+        message="Snapshot status retrieved successfully"
+    )
+
+@app.post("/api/snapshot/refresh", response_model=ApiResponse)
+async def api_snapshot_refresh():
+    """Reload the in-memory snapshot from the database."""
+    try:
+        await reload_data()
         return ApiResponse(
             success=True,
-            data=df_to_json(df),
-            message=f"General agricultural chart data for {input_region} generated successfully"
+            data=snapshot.stats(),
+            message="Snapshot refreshed successfully"
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Connection Pool Endpoint
+@app.get("/api/pool", response_model=ApiResponse)
+async def api_pool_status():
+    """Report connection pool occupancy and wait-time statistics."""
+    return ApiResponse(
+        success=True,
+        data=get_pool_status(),
+        message="Connection pool status retrieved successfully"
+    )
+
+# Response Cache Endpoint
+@app.get("/api/cache", response_model=ApiResponse)
+async def api_cache_status():
+    """Report response cache size, hit rate and the data version it serves."""
+    return ApiResponse(
+        success=True,
+        data=response_cache.stats(),
+        message="Response cache status retrieved successfully"
+    )
+
 # Additional utility endpoints
 @app.get("/api/endpoints", response_model=Dict[str, List[Dict[str, str]]])
 async def list_endpoints():
@@ -359,6 +1017,7 @@ async def list_endpoints():
         {"method": "GET", "path": "/health", "description": "Health check endpoint"},
         {"method": "GET", "path": "/api/data/nasional", "description": "Get national level agricultural data"},
         {"method": "POST", "path": "/api/data/parent", "description": "Get parent data information for a region"},
+        {"method": "GET", "path": "/api/data/regions", "description": "Get every provinsi, kota and kabupaten name"},
         {"method": "POST", "path": "/api/data/panen", "description": "Get agricultural data by region"},
         {"method": "POST", "path": "/api/data/total-panen", "description": "Get total agricultural data by region"},
         {"method": "POST", "path": "/api/data/wilayah-panen-tertinggi", "description": "Get regions with highest harvest"},
@@ -366,11 +1025,21 @@ async def list_endpoints():
         {"method": "POST", "path": "/api/data/ringkasan", "description": "Generate summary report"},
         {"method": "POST", "path": "/api/data/iklim", "description": "Get climate data"},
         {"method": "POST", "path": "/api/data/ksa", "description": "Get KSA data"},
+        {"method": "GET/POST", "path": "/api/data/ksa/periods", "description": "KSA data for a month range with MoM and YoY deltas"},
+        {"method": "GET/POST", "path": "/api/data/iklim/series", "description": "Climate readings for a month range, per station or aggregated"},
         {"method": "GET/POST", "path": "/api/charts/climate", "description": "Climate visualization data"},
         {"method": "GET/POST", "path": "/api/charts/harvest-regions", "description": "Harvest regions visualization data"},
         {"method": "GET/POST", "path": "/api/charts/harvest-vs-ksa", "description": "Harvest vs KSA comparison data"},
         {"method": "GET/POST", "path": "/api/charts/machinery-effectiveness", "description": "Machinery effectiveness data"},
         {"method": "GET/POST", "path": "/api/charts/general-data", "description": "General agricultural data"},
+        {"method": "GET/POST", "path": "/api/rank", "description": "Top-k regions by any metric or ratio"},
+        {"method": "GET/POST", "path": "/api/rollup", "description": "Rolled-up totals of a region and its child regions"},
+        {"method": "GET/POST", "path": "/api/dashboard", "description": "Parent data and all chart payloads for a region"},
+        {"method": "POST", "path": "/api/batch", "description": "Run many analyses for many regions in one call"},
+        {"method": "GET", "path": "/api/snapshot", "description": "In-memory data snapshot status"},
+        {"method": "POST", "path": "/api/snapshot/refresh", "description": "Reload the in-memory data snapshot"},
+        {"method": "GET", "path": "/api/pool", "description": "Database connection pool statistics"},
+        {"method": "GET", "path": "/api/cache", "description": "Response cache statistics"},
     ]
     
     return {"endpoints": endpoints}
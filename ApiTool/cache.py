@@ -0,0 +1,110 @@
+"""
+Response cache for the data and chart endpoints.
+Entries are evicted least-recently-used first and expire after a TTL. The whole
+cache is tied to the data version written by insert_data.py, so it is cleared
+as soon as new data is ingested and ETags stay valid for as long as the data is.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from gazetteer import normalize_name
+
+# Cache size (number of responses) and lifetime of each entry in seconds
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry TTL, versioned by the ingested data."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.data_version: Optional[int] = None
+        self.tag = ""
+        self.reset(None)
+
+    @staticmethod
+    def key(endpoint: str, region: Optional[str] = None, month: Optional[str] = None, *params) -> str:
+        """Cache key for an endpoint called with a region, a month and any further parameters."""
+        region_key = normalize_name(region) if region is not None else ""
+        month_key = month.strip() if month is not None else ""
+        key = f"{endpoint}|{region_key}|{month_key}"
+        return "|".join([key, *(str(param) for param in params)]) if params else key
+
+    def etag(self, key: str) -> str:
+        """Strong ETag for a key under the current data version."""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return f'"{self.tag}-{digest}"'
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes, tag: Optional[str] = None):
+        """Store a value, unless it was computed before the last reset (``tag`` differs)."""
+        with self._lock:
+            if tag is not None and tag != self.tag:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def reset(self, data_version: Optional[int]):
+        """Drop every entry and start serving the given data version."""
+        with self._lock:
+            self._entries.clear()
+            self.data_version = data_version
+            # Without a version marker, fall back to a per-load tag so old ETags never match
+            self.tag = str(data_version) if data_version is not None else f"t{time.time_ns():x}"
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "data_version": self.data_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches ``etag``."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+response_cache = ResponseCache()
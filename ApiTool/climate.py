@@ -0,0 +1,88 @@
+"""
+Dense climate time series built from data_iklim.
+Every station's monthly readings are held in one station x month x parameter array,
+so a month range for any set of stations is a slice and provinsi, pulau or national
+aggregates are a single grouped sum over the station axis.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from snapshot import ColumnarTable
+
+BULAN = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
+
+CLIMATE_PARAMETERS = ["curah_hujan", "suhu", "kelembaban", "lama_penyinaran"]
+
+CLIMATE_AGGREGATES = ("sum", "mean")
+
+
+def month_index(month) -> int:
+    """Position (0-11) of a month given by its Indonesian name or its number 1-12."""
+    text = str(month).strip()
+    if text.isdigit() and 1 <= int(text) <= 12:
+        return int(text) - 1
+    for position, name in enumerate(BULAN):
+        if text.lower() in (name.lower(), name[:3].lower()):
+            return position
+    raise ValueError(f"Unknown month '{month}', use a month name or a number 1-12")
+
+
+def month_range(start=None, end=None) -> List[int]:
+    """Month positions from ``start`` to ``end`` inclusive, wrapping past Desember."""
+    first = month_index(start) if start is not None else 0
+    last = month_index(end) if end is not None else 11
+    return [(first + offset) % 12 for offset in range((last - first) % 12 + 1)]
+
+
+class ClimateSeries:
+    """Monthly readings of every station as a dense (station, month, parameter) array."""
+
+    def __init__(self, stations: np.ndarray, provinsi: np.ndarray, values: np.ndarray):
+        self.stations = stations
+        self.provinsi = provinsi
+        self.values = values
+
+    @classmethod
+    def from_table(cls, table: ColumnarTable) -> "ClimateSeries":
+        """Scatter the data_iklim rows into the dense array; missing readings stay NaN."""
+        stations = table.categories["stasiun"]
+        station_codes = table.arrays["stasiun"].astype("int64")
+        month_of_code = np.array([month_index(name) for name in table.categories["bulan"]], dtype="int64")
+        months = month_of_code[table.arrays["bulan"]]
+
+        values = np.full((len(stations), len(BULAN), len(CLIMATE_PARAMETERS)), np.nan)
+        values[station_codes, months] = np.column_stack([
+            table.arrays[column].astype("float64") for column in CLIMATE_PARAMETERS
+        ])
+
+        provinsi = np.empty(len(stations), dtype=object)
+        provinsi[station_codes] = table.categories["provinsi"][table.arrays["provinsi"]]
+        return cls(stations, provinsi, values)
+
+    def select(self, stations: Optional[np.ndarray], months: Sequence[int]) -> np.ndarray:
+        """The (station, month, parameter) sub-array for a station mask and month positions."""
+        values = self.values if stations is None else self.values[stations]
+        return values[:, list(months)]
+
+    @staticmethod
+    def aggregate(values: np.ndarray, groups: np.ndarray, group_count: int, how: str = "sum") -> np.ndarray:
+        """Combine stations into ``group_count`` groups along the first axis, ignoring NaN."""
+        if how not in CLIMATE_AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{how}', use one of: {', '.join(CLIMATE_AGGREGATES)}")
+        present = ~np.isnan(values)
+        totals = np.zeros((group_count,) + values.shape[1:])
+        np.add.at(totals, groups, np.where(present, values, 0.0))
+        counts = np.zeros((group_count,) + values.shape[1:])
+        np.add.at(counts, groups, present)
+        if how == "mean":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(counts > 0, totals / counts, np.nan)
+        return np.where(counts > 0, totals, np.nan)
+
+    def stats(self) -> Dict:
+        return {"stations": len(self.stations), "shape": list(self.values.shape)}
@@ -0,0 +1,170 @@
+"""
+Database engine, connection pool settings and pool health metrics.
+Pool sizing is configured through environment variables, and every request
+shares a single lazily checked-out connection between all of its helpers.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import dotenv
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.orm import sessionmaker
+
+# Load environment variables
+dotenv.load_dotenv()
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Connection pool settings
+DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", "true")
+
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+SessionLocal = sessionmaker(bind=engine)
+
+
+class PoolMetrics:
+    """Counters for connection pool activity, updated from pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def increment(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_avg": self.wait_seconds_total / self.waits if self.waits else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+event.listen(engine, "connect", lambda *args: pool_metrics.increment("connects"))
+event.listen(engine, "checkout", lambda *args: pool_metrics.increment("checkouts"))
+event.listen(engine, "checkin", lambda *args: pool_metrics.increment("checkins"))
+event.listen(engine, "invalidate", lambda *args: pool_metrics.increment("invalidations"))
+
+
+def checkout_connection():
+    """Check a connection out of the pool, recording how long it took."""
+    started = time.perf_counter()
+    try:
+        connection = engine.connect()
+    except exc.TimeoutError:
+        pool_metrics.increment("timeouts")
+        raise
+    pool_metrics.record_wait(time.perf_counter() - started)
+    return connection
+
+
+class RequestConnection:
+    """One connection per request, checked out on first use and shared by all helpers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._connection = None
+
+    def get(self):
+        if self._connection is None:
+            self._connection = checkout_connection()
+        return self._connection
+
+    @property
+    def is_open(self) -> bool:
+        return self._connection is not None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+# Set by the API middleware for the duration of each request
+request_connection: ContextVar[Optional[RequestConnection]] = ContextVar("request_connection", default=None)
+
+
+@contextmanager
+def get_connection():
+    """Yield the current request's connection, or a short-lived one outside a request."""
+    holder = request_connection.get()
+    if holder is None:
+        connection = checkout_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+        return
+
+    with holder.lock:
+        yield holder.get()
+
+
+def get_data_version() -> Optional[int]:
+    """Data version marker bumped by insert_data.py after every ingest, or None if missing."""
+    try:
+        # Use a dedicated connection so a missing table cannot abort the request's transaction
+        with checkout_connection() as connection:
+            return connection.execute(text("SELECT version FROM data_version")).scalar()
+    except exc.SQLAlchemyError:
+        return None
+
+
+def get_pool_status() -> Dict:
+    """Current pool occupancy, configuration and activity counters."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "settings": {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+        },
+        "metrics": pool_metrics.snapshot(),
+    }
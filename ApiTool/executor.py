@@ -0,0 +1,29 @@
+"""
+Bounded thread pool for running blocking data functions from async endpoints.
+The pandas/SQLAlchemy helpers in utils.py are synchronous; running them here
+keeps the uvicorn event loop free to serve other clients in the meantime.
+"""
+
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Number of blocking calls that may run at the same time
+TOOL_API_WORKERS = int(os.getenv("TOOL_API_WORKERS", "8"))
+
+executor = ThreadPoolExecutor(max_workers=TOOL_API_WORKERS, thread_name_prefix="tool-api")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking function in the bounded pool and await its result."""
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. the request's shared connection) into the worker
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, partial(context.run, func, *args, **kwargs))
+
+
+def shutdown_executor():
+    """Stop accepting new work and release the worker threads."""
+    executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,157 @@
+"""
+Region gazetteer for resolving user input to provinsi/kabupaten/kota/kecamatan.
+Names are indexed once per snapshot load with a hash map for exact lookups and
+a trigram index for substring lookups, so resolution needs no SQL queries.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+REGION_LEVELS = ("provinsi", "kota", "kabupaten", "kecamatan")
+
+# Administrative prefixes users put in front of region names
+REGION_PREFIXES = (
+    "provinsi ", "prov. ", "prov ",
+    "kabupaten ", "kab. ", "kab ",
+    "kota ",
+    "kecamatan ", "kec. ", "kec ",
+)
+
+NGRAM_SIZE = 3
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase a name and collapse its whitespace."""
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+def strip_region_prefix(text: str) -> str:
+    """Remove a leading administrative prefix such as "kabupaten " or "kota "."""
+    for prefix in REGION_PREFIXES:
+        if text.startswith(prefix):
+            return text[len(prefix):].strip()
+    return text
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> Set[str]:
+    """Character n-grams of a string."""
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+@dataclass(frozen=True)
+class RegionEntry:
+    """A single named region with its parent links."""
+    level: str
+    name: str
+    provinsi: str
+    kabupaten: Optional[str]
+    key: str
+    bare: str
+    order: int
+
+
+class RegionGazetteer:
+    """Hash map plus trigram index over the region names of ``data_panen``."""
+
+    def __init__(self, entries: List[RegionEntry]):
+        self.entries = entries
+        self._exact: Dict[str, Dict[str, List[int]]] = {level: {} for level in REGION_LEVELS}
+        self._ngram_index: Dict[str, Dict[str, Set[int]]] = {level: {} for level in REGION_LEVELS}
+        self._by_level: Dict[str, List[int]] = {level: [] for level in REGION_LEVELS}
+
+        for position, entry in enumerate(entries):
+            self._by_level[entry.level].append(position)
+            exact = self._exact[entry.level]
+            for key in {entry.key, entry.bare}:
+                exact.setdefault(key, []).append(position)
+            index = self._ngram_index[entry.level]
+            for gram in ngrams(entry.key):
+                index.setdefault(gram, set()).add(position)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "RegionGazetteer":
+        """Build the gazetteer from ``id, provinsi, kabupaten, kecamatan`` rows."""
+        df = df.sort_values("id")
+        entries: List[RegionEntry] = []
+
+        def add(level, name, provinsi, kabupaten, order):
+            key = normalize_name(name)
+            entries.append(RegionEntry(
+                level=level,
+                name=name,
+                provinsi=provinsi,
+                kabupaten=kabupaten,
+                key=key,
+                bare=strip_region_prefix(key),
+                order=int(order),
+            ))
+
+        provinsi_rows = df.drop_duplicates("provinsi")
+        for row in provinsi_rows.itertuples(index=False):
+            if row.provinsi not in ("-", "nan", ""):
+                add("provinsi", row.provinsi, row.provinsi, None, row.id)
+
+        kabupaten_rows = df[df["kabupaten"] != "-"].drop_duplicates(["provinsi", "kabupaten"])
+        for row in kabupaten_rows.itertuples(index=False):
+            if normalize_name(row.kabupaten).startswith("kota "):
+                add("kota", row.kabupaten, row.provinsi, None, row.id)
+            add("kabupaten", row.kabupaten, row.provinsi, None, row.id)
+
+        kecamatan_rows = df[df["kecamatan"] != "-"].drop_duplicates(["provinsi", "kabupaten", "kecamatan"])
+        for row in kecamatan_rows.itertuples(index=False):
+            add("kecamatan", row.kecamatan, row.provinsi, row.kabupaten, row.id)
+
+        return cls(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _rank(entry: RegionEntry, query: str):
+        """Sort key: exact, then prefix, then word start, then any substring match."""
+        if query in (entry.key, entry.bare):
+            quality = 0
+        elif entry.bare.startswith(query):
+            quality = 1
+        elif f" {query}" in f" {entry.key}":
+            quality = 2
+        else:
+            quality = 3
+        return quality, len(entry.key), entry.order
+
+    def exact(self, level: str, text: str) -> List[RegionEntry]:
+        """Entries whose normalized name (with or without prefix) equals ``text``."""
+        query = normalize_name(text)
+        positions = self._exact[level].get(query, [])
+        return sorted((self.entries[p] for p in positions), key=lambda e: e.order)
+
+    def contains(self, level: str, text: str) -> List[RegionEntry]:
+        """Entries whose name contains ``text``, best candidates first."""
+        query = normalize_name(text)
+        if not query:
+            return []
+
+        grams = ngrams(query)
+        if grams:
+            index = self._ngram_index[level]
+            postings = [index.get(gram) for gram in grams]
+            if any(posting is None for posting in postings):
+                return []
+            candidates = set.intersection(*sorted(postings, key=len))
+        else:
+            candidates = self._by_level[level]
+
+        matches = [self.entries[p] for p in candidates if query in self.entries[p].key]
+        return sorted(matches, key=lambda e: self._rank(e, query))
+
+    def best(self, level: str, text: str) -> Optional[RegionEntry]:
+        """Highest ranked substring match at ``level``, if any."""
+        matches = self.contains(level, text)
+        return matches[0] if matches else None
+
+    def names(self, level: str) -> List[str]:
+        """Distinct names indexed at ``level``."""
+        return sorted({self.entries[p].name for p in self._by_level[level]})
@@ -0,0 +1,118 @@
+"""
+Hierarchical rollup of data_panen: kecamatan, kabupaten, provinsi and nasional sums
+of every metric column, computed from the kecamatan rows in one vectorized pass.
+The leaf rows are sorted once by (provinsi, kabupaten, kecamatan); every level is then
+a np.add.reduceat over the level below, so the children of a node are a contiguous
+slice and drilling down is an index lookup.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from snapshot import ColumnarTable
+
+ROLLUP_LEVELS = ("nasional", "provinsi", "kabupaten", "kecamatan")
+
+
+class RollupCube:
+    """Metric sums for every node of the provinsi > kabupaten > kecamatan hierarchy."""
+
+    def __init__(self, levels: Dict[str, pd.DataFrame], child_ranges: Dict[str, np.ndarray], metric_columns: List[str]):
+        self.levels = levels
+        self.child_ranges = child_ranges
+        self.metric_columns = metric_columns
+        self._index: Dict[str, Dict[Tuple[str, ...], int]] = {
+            level: {
+                tuple(key): position
+                for position, key in enumerate(frame[list(ROLLUP_LEVELS[1:ROLLUP_LEVELS.index(level) + 1])].itertuples(index=False))
+            }
+            for level, frame in levels.items()
+        }
+
+    @classmethod
+    def from_table(cls, table: ColumnarTable, metric_columns: Sequence[str]) -> "RollupCube":
+        """Build the cube from the kecamatan rows of a columnar data_panen table."""
+        metric_columns = list(metric_columns)
+        # Rows that name a kecamatan without its kabupaten cannot be placed in the hierarchy
+        leaves = np.flatnonzero(~table.equals("kecamatan", "-") & ~table.equals("kabupaten", "-"))
+        codes = [table.arrays[level][leaves].astype("int64") for level in ROLLUP_LEVELS[1:]]
+        order = np.lexsort(codes[::-1])
+        leaves = leaves[order]
+        codes = [level_codes[order] for level_codes in codes]
+        values = np.column_stack([
+            np.nan_to_num(table.arrays[column][leaves].astype("float64")).astype("int64")
+            for column in metric_columns
+        ]) if len(leaves) else np.zeros((0, len(metric_columns)), dtype="int64")
+
+        levels: Dict[str, pd.DataFrame] = {}
+        child_ranges: Dict[str, np.ndarray] = {}
+
+        # Walk up from kecamatan: each level's groups are runs of equal key prefixes
+        starts = np.arange(len(leaves))
+        sums = values
+        for depth in range(len(ROLLUP_LEVELS) - 1, 0, -1):
+            level = ROLLUP_LEVELS[depth]
+            prefix = codes[:depth]
+            group_starts = _run_starts([level_codes[starts] for level_codes in prefix], len(starts))
+            if depth < len(ROLLUP_LEVELS) - 1:
+                child_ranges[level] = np.column_stack([group_starts, np.r_[group_starts[1:], len(starts)]])
+                sums = np.add.reduceat(sums, group_starts, axis=0) if len(starts) else sums
+                starts = starts[group_starts]
+            levels[level] = _level_frame(table, leaves[starts], ROLLUP_LEVELS[1:depth + 1], sums, metric_columns)
+            if depth == len(ROLLUP_LEVELS) - 1:
+                child_ranges[level] = np.zeros((len(starts), 2), dtype="int64")
+
+        child_ranges["nasional"] = np.array([[0, len(levels["provinsi"])]])
+        total = sums.sum(axis=0, keepdims=True) if len(sums) else np.zeros((1, len(metric_columns)), dtype="int64")
+        levels["nasional"] = pd.DataFrame(total, columns=metric_columns)
+        return cls(levels, child_ranges, metric_columns)
+
+    def find(self, path: Sequence[str]) -> Optional[Tuple[str, int]]:
+        """Level and position of the node at ``path`` (provinsi, kabupaten, kecamatan prefix)."""
+        level = ROLLUP_LEVELS[len(path)]
+        position = 0 if level == "nasional" else self._index[level].get(tuple(path))
+        return None if position is None else (level, position)
+
+    def node(self, path: Sequence[str]) -> Optional[Dict]:
+        """The sums of a single node, with its level and names."""
+        found = self.find(path)
+        if found is None:
+            return None
+        level, position = found
+        record = self.levels[level].iloc[position].to_dict()
+        return {"level": level, **record}
+
+    def children(self, path: Sequence[str]) -> pd.DataFrame:
+        """The nodes directly below ``path``, in name order."""
+        found = self.find(path)
+        if found is None or found[0] == "kecamatan":
+            return pd.DataFrame()
+        level, position = found
+        start, end = self.child_ranges[level][position]
+        child_level = ROLLUP_LEVELS[ROLLUP_LEVELS.index(level) + 1]
+        return self.levels[child_level].iloc[start:end].reset_index(drop=True)
+
+    def stats(self) -> Dict:
+        return {level: len(frame) for level, frame in self.levels.items()}
+
+
+def _run_starts(keys: List[np.ndarray], length: int) -> np.ndarray:
+    """Start positions of runs of equal rows across the sorted key arrays."""
+    if length == 0:
+        return np.zeros(0, dtype="int64")
+    changed = np.zeros(length, dtype=bool)
+    changed[0] = True
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(changed)
+
+
+def _level_frame(table: ColumnarTable, rows: np.ndarray, name_columns: Sequence[str],
+                 sums: np.ndarray, metric_columns: List[str]) -> pd.DataFrame:
+    """Names of each group (taken from its first leaf row) next to its sums."""
+    frame = table.take(rows, list(name_columns))
+    for position, column in enumerate(metric_columns):
+        frame[column] = sums[:, position]
+    return frame
@@ -0,0 +1,185 @@
+"""
+In-memory columnar snapshot of the agricultural tables.
+PostgreSQL stays the source of truth; this module keeps a read-only copy of
+each table as NumPy arrays (with categorical codes for region names) so the
+API can filter and aggregate without a database round-trip per request.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Table, select, text
+
+logger = logging.getLogger(__name__)
+
+
+def like_to_regex(pattern: str) -> "re.Pattern":
+    """Translate a SQL LIKE pattern (% and _ wildcards) into a compiled regex."""
+    parts = []
+    for char in pattern:
+        if char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+class ColumnarTable:
+    """Column-oriented, read-only copy of a single table."""
+
+    def __init__(self, df: pd.DataFrame, categorical_columns: Iterable[str] = ()):
+        categorical_columns = set(categorical_columns)
+        self.columns: List[str] = list(df.columns)
+        self.length = len(df)
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+
+        for column in self.columns:
+            if column in categorical_columns:
+                categorical = pd.Categorical(df[column])
+                self.arrays[column] = categorical.codes
+                self.categories[column] = np.asarray(categorical.categories, dtype=object)
+            else:
+                self.arrays[column] = df[column].to_numpy()
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint of the stored arrays."""
+        total = sum(array.nbytes for array in self.arrays.values())
+        total += sum(sum(len(str(name)) for name in names) for names in self.categories.values())
+        return total
+
+    def all(self) -> np.ndarray:
+        """Mask selecting every row."""
+        return np.ones(self.length, dtype=bool)
+
+    def _codes_mask(self, column: str, selected: np.ndarray) -> np.ndarray:
+        """Turn a boolean selection over categories into a row mask."""
+        codes = np.flatnonzero(selected)
+        if len(codes) == 0:
+            return np.zeros(self.length, dtype=bool)
+        return np.isin(self.arrays[column], codes)
+
+    def equals(self, column: str, value) -> np.ndarray:
+        """Rows where ``column == value`` (case sensitive, like SQL ``=``)."""
+        if column not in self.categories:
+            return self.arrays[column] == value
+        return self._codes_mask(column, self.categories[column] == value)
+
+    def isin(self, column: str, values: Sequence) -> np.ndarray:
+        """Rows where ``column`` is one of ``values``."""
+        if column not in self.categories:
+            return np.isin(self.arrays[column], list(values))
+        return self._codes_mask(column, np.isin(self.categories[column], list(values)))
+
+    def ilike(self, column: str, pattern: str) -> np.ndarray:
+        """Rows where ``column ILIKE pattern``; only the distinct names are scanned."""
+        regex = like_to_regex(pattern)
+        names = self.categories[column]
+        selected = np.fromiter(
+            (regex.fullmatch(str(name)) is not None for name in names),
+            dtype=bool,
+            count=len(names),
+        )
+        return self._codes_mask(column, selected)
+
+    def to_frame(self, mask: Optional[np.ndarray] = None, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Materialize the selected rows and columns as a DataFrame."""
+        rows = np.flatnonzero(mask) if mask is not None else np.arange(self.length)
+        return self.take(rows, columns)
+
+    def take(self, rows: np.ndarray, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Materialize the rows at the given positions, in that order, as a DataFrame."""
+        columns = list(columns) if columns is not None else self.columns
+
+        data = {}
+        for column in columns:
+            values = self.arrays[column][rows]
+            if column in self.categories:
+                values = np.asarray(
+                    pd.Categorical.from_codes(values, categories=self.categories[column]),
+                    dtype=object,
+                )
+            data[column] = values
+
+        return pd.DataFrame(data, columns=columns)
+
+
+class DataSnapshot:
+    """Lazily loaded, refreshable set of columnar tables read from the database."""
+
+    def __init__(self, connect: Callable, tables: Dict[str, Tuple[Union[Table, str], Sequence[str]]]):
+        self.connect = connect
+        self.table_specs = tables
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self._tables: Dict[str, ColumnarTable] = {}
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._tables)
+
+    def load(self):
+        """(Re)load every table from the database and swap it in atomically."""
+        started = time.perf_counter()
+        tables = {}
+        with self.connect() as connection:
+            for name, (source, categorical_columns) in self.table_specs.items():
+                if isinstance(source, Table):
+                    df = pd.read_sql(select(source).order_by(source.c.id), connection)
+                else:
+                    # Views without an ORM model, e.g. the materialized aggregates
+                    df = pd.read_sql(text(f"SELECT * FROM {source}"), connection)
+                    if "id" in df.columns:
+                        df = df.sort_values("id", ignore_index=True)
+                tables[name] = ColumnarTable(df, categorical_columns)
+
+        with self._lock:
+            self._tables = tables
+            self._derived = {}
+            self.loaded_at = time.time()
+            self.load_seconds = time.perf_counter() - started
+
+        logger.info("Snapshot loaded in %.3fs: %s", self.load_seconds,
+                    {name: len(table) for name, table in tables.items()})
+
+    def table(self, name: str) -> ColumnarTable:
+        """Get a loaded table, loading the snapshot on first use."""
+        if not self._tables:
+            with self._load_lock:
+                if not self._tables:
+                    self.load()
+        return self._tables[name]
+
+    def derived(self, name: str, builder: Callable[["DataSnapshot"], Any]) -> Any:
+        """Get an index built from the loaded tables, rebuilding it after every reload."""
+        self.table(next(iter(self.table_specs)))
+        derived = self._derived
+        if name not in derived:
+            derived[name] = builder(self)
+        return derived[name]
+
+    def stats(self) -> Dict:
+        """Describe the currently loaded snapshot."""
+        return {
+            "loaded": self.is_loaded,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+            "tables": {
+                name: {"rows": len(table), "bytes": table.nbytes}
+                for name, table in self._tables.items()
+            },
+        }
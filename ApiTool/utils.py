@@ -4,21 +4,20 @@ This module contains all the database models and utility functions
 extracted from the DB tools notebook.
 """
 
-import os
+import numpy as np
 import pandas as pd
-from typing import Literal
-from sqlalchemy import create_engine, Column, Integer, String, Float, inspect
+from dataclasses import dataclass, field
+from typing import Dict, Literal, Optional, Sequence, Tuple, Union
+from sqlalchemy import Column, Integer, String, select
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import dotenv
 
-# Load environment variables
-dotenv.load_dotenv()
+from database import get_connection, checkout_connection
+from snapshot import DataSnapshot
+from rollup import RollupCube
+from climate import ClimateSeries, CLIMATE_PARAMETERS, BULAN, month_index, month_range
+from gazetteer import RegionGazetteer, normalize_name, strip_region_prefix
 
 # Database setup
-DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
 
@@ -73,16 +72,59 @@ class KSA(Base):
     produksi_padi = Column(Integer, nullable=True)
 
 
+PANEN_METRIC_COLUMNS = [
+    "perkiraan_panen_september", "perkiraan_panen_oktober",
+    "alsintan_september", "alsintan_oktober", "bera", "penggenangan",
+    "tanam", "vegetatif_1", "vegetatif_2", "max_vegetatif",
+    "generatif_1", "generatif_2", "panen", "standing_crop", "luas_baku_sawah"
+]
+
+
+# Columns that can be sorted and range-filtered in paged queries
+PANEN_NUMERIC_COLUMNS = ["id"] + PANEN_METRIC_COLUMNS
+
+
+# Derived metrics available for ranking, as (numerator columns, denominator columns)
+PANEN_RATIO_METRICS = {
+    "total_alsintan": (["alsintan_september", "alsintan_oktober"], None),
+    "efektivitas_hasil": (["panen"], ["alsintan_september", "alsintan_oktober"]),
+    "efektivitas_luas": (["luas_baku_sawah"], ["alsintan_september", "alsintan_oktober"]),
+    "rasio_panen": (["panen"], ["luas_baku_sawah"]),
+    "rasio_tanam": (["tanam"], ["luas_baku_sawah"]),
+}
+
+# Hierarchy used by the ranking API: each level and the level it is grouped under
+RANK_LEVELS = ("provinsi", "kabupaten", "kecamatan")
+RANK_PARENT_LEVEL = {"provinsi": None, "kabupaten": "provinsi", "kecamatan": "kabupaten"}
+
+
+# In-memory snapshot of the tables above, answered without SQL round-trips.
+# The mv_* materialized views are precomputed at ingest (ApiDB/migrations/004_aggregate_views.sql).
+snapshot = DataSnapshot(get_connection, {
+    "data_panen": (DataPanen.__table__, ["provinsi", "kabupaten", "kecamatan"]),
+    "data_iklim": (Iklim.__table__, ["stasiun", "provinsi", "bulan"]),
+    "data_ksa": (KSA.__table__, ["provinsi", "kabupaten", "bulan"]),
+    "mv_panen_nasional": ("mv_panen_nasional", []),
+    "mv_panen_provinsi": ("mv_panen_provinsi", ["provinsi"]),
+    "mv_panen_kabupaten": ("mv_panen_kabupaten", ["provinsi", "kabupaten"]),
+    "mv_panen_efektivitas": ("mv_panen_efektivitas", ["provinsi", "kabupaten", "kecamatan"]),
+    "mv_ksa_kabupaten": ("mv_ksa_kabupaten", ["provinsi", "kabupaten", "bulan"]),
+    "mv_ksa_provinsi": ("mv_ksa_provinsi", ["provinsi", "bulan"]),
+    "region_crosswalk": ("region_crosswalk", ["level", "panen_provinsi", "panen_kabupaten", "ksa_provinsi", "ksa_kabupaten", "metode"]),
+    "region_pulau": ("region_pulau", []),
+})
+
+
 # Utility Functions
 def determine_region_type(input_text: str) -> Literal["kecamatan", "kabupaten", "provinsi", "unknown", "nasional"]:
     """Determine the type of region based on input text."""
     input_text = input_text.lower()
 
     # Keywords for kecamatan, kabupaten, and provinsi
-    kecamatan_keywords = ["kecamatan", "desa", "kelurahan"]
-    kabupaten_keywords = ["kabupaten"]
+    kecamatan_keywords = ["kecamatan", "kec.", "desa", "kelurahan"]
+    kabupaten_keywords = ["kabupaten", "kab."]
     kota_keywords = ["kota"]
-    provinsi_keywords = ["provinsi"]
+    provinsi_keywords = ["provinsi", "prov."]
     nasional_keywords = ["nasional", "indonesia", "seluruh", "semua provinsi", "semua"]
 
     # Determine the region type based on keywords
@@ -100,174 +142,108 @@ def determine_region_type(input_text: str) -> Literal["kecamatan", "kabupaten",
         return "unknown"
 
 
+def get_region_gazetteer() -> RegionGazetteer:
+    """Get the region gazetteer built from the current snapshot."""
+    return snapshot.derived("gazetteer", lambda snap: RegionGazetteer.from_frame(
+        snap.table("data_panen").to_frame(columns=["id", "provinsi", "kabupaten", "kecamatan"])
+    ))
+
+
+# Levels a free-text matcher (such as the chatbot's intent fast path) can look names up in
+REGION_NAME_LEVELS = ("provinsi", "kota", "kabupaten")
+
+
+def get_region_names() -> Dict[str, list]:
+    """Every provinsi, kota and kabupaten name in the gazetteer, per level."""
+    gazetteer = get_region_gazetteer()
+    return {level: gazetteer.names(level) for level in REGION_NAME_LEVELS}
+
+
 def check_region_in_database(input_text: str) -> Literal["kecamatan", "kabupaten", "provinsi", "kota", "not_found"]:
     """Check if the input text matches any region in the database."""
-    session = SessionLocal()
-    try:
-        # Check if the input matches a provinsi
-        provinsi_match = session.query(DataPanen).filter(DataPanen.provinsi.ilike(f"%{input_text}%")).first()
-        if provinsi_match:
-            return "provinsi"
-        
-        # Check if the input matches a kota
-        kota_match = session.query(DataPanen).filter(DataPanen.kabupaten.ilike(f"Kota {input_text}")).first()
-        if kota_match:
-            return "kota"
-        
-        # Check if the input matches a kabupaten
-        kabupaten_match = session.query(DataPanen).filter(DataPanen.kabupaten.ilike(f"%{input_text}%")).first()
-        if kabupaten_match:
-            return "kabupaten"
-
-        # Check if the input matches a kecamatan
-        kecamatan_match = session.query(DataPanen).filter(DataPanen.kecamatan.ilike(f"%{input_text}%")).first()
-        if kecamatan_match:
-            return "kecamatan"
-
-        return "not_found"
-    finally:
-        session.close()
+    gazetteer = get_region_gazetteer()
+
+    # Same precedence as before: provinsi, exact kota, kabupaten, kecamatan
+    if gazetteer.contains("provinsi", input_text):
+        return "provinsi"
+    if gazetteer.exact("kota", input_text):
+        return "kota"
+    if gazetteer.contains("kabupaten", input_text):
+        return "kabupaten"
+    if gazetteer.contains("kecamatan", input_text):
+        return "kecamatan"
+
+    return "not_found"
 
 
 # Core Data Retrieval Functions
 def get_data_nasional():
     """Get national level agricultural data."""
-    session = SessionLocal()
-    try:
-        query = session.query(DataPanen).filter(
-            DataPanen.kabupaten == "-",
-            DataPanen.kecamatan == "-"
-        )
-        df = pd.read_sql(query.statement, session.bind)
-        return df
-    finally:
-        session.close()
+    panen = snapshot.table("data_panen")
+    mask = panen.equals("kabupaten", "-") & panen.equals("kecamatan", "-")
+    return panen.to_frame(mask)
 
 
 def get_data_by_provinsi(provinsi_name: str):
     """Get agricultural data by province name."""
-    session = SessionLocal()
-    try:
-        query = session.query(DataPanen).filter(
-            DataPanen.provinsi.ilike(provinsi_name),
-            DataPanen.kecamatan == "-"
-        )
-        df = pd.read_sql(query.statement, session.bind)
-        return df
-    finally:
-        session.close()
+    panen = snapshot.table("data_panen")
+    mask = panen.ilike("provinsi", provinsi_name) & panen.equals("kecamatan", "-")
+    return panen.to_frame(mask)
 
 
 def get_data_by_kabupaten_kota(kabupaten_kota_name: str):
     """Get agricultural data by kabupaten/kota name."""
-    session = SessionLocal()
-    try:
-        query = session.query(DataPanen).filter(DataPanen.kabupaten.ilike(kabupaten_kota_name))
-        df = pd.read_sql(query.statement, session.bind)
-        return df
-    finally:
-        session.close()
+    panen = snapshot.table("data_panen")
+    return panen.to_frame(panen.ilike("kabupaten", kabupaten_kota_name))
 
 
 def get_data_by_kecamatan(kecamatan_name: str):
     """Get agricultural data by kecamatan name."""
-    session = SessionLocal()
-    try:
-        query = session.query(DataPanen).filter(DataPanen.kecamatan.ilike(kecamatan_name))
-        df = pd.read_sql(query.statement, session.bind)
-        return df
-    finally:
-        session.close()
+    panen = snapshot.table("data_panen")
+    return panen.to_frame(panen.ilike("kecamatan", kecamatan_name))
 
 
 def get_parent_data(user_input: str):
     """Get parent data information for a given region input."""
     # Step 1: Normalize input and determine region type
-    normalized_input = user_input.lower().strip()
+    normalized_input = normalize_name(user_input)
     region_type = determine_region_type(normalized_input)
 
-    # Step 2: If unknown, check in the database
+    # Step 2: If unknown, check in the gazetteer
     if region_type == "unknown":
         region_type = check_region_in_database(normalized_input)
 
-    # Step 3: Fetch parent data based on the determined region type
+    # Step 3: Resolve the best ranked region and its parents
+    gazetteer = get_region_gazetteer()
+    region_name = strip_region_prefix(normalized_input)
+
     if region_type == "provinsi":
-        prefixes = ["provinsi"]
-        
-        for prefix in prefixes:
-            if normalized_input.startswith(prefix):
-                normalized_input = normalized_input[len(prefix):].strip()
-                break
-        
-        return {"provinsi": normalized_input, "parent": "nasional"}
-    
+        matches = gazetteer.exact("provinsi", region_name)
+        provinsi = matches[0].name if matches else region_name
+        return {"provinsi": provinsi, "parent": "nasional"}
+
     elif region_type == "kota":
-        prefixes = ["kota"]
-        
-        for prefix in prefixes:
-            if normalized_input.startswith(prefix):
-                normalized_input = normalized_input[len(prefix):].strip()
-                break
-        
-        session = SessionLocal()
-        try:
-            kota_data = session.query(DataPanen).filter(
-                DataPanen.kabupaten.ilike(f"Kota {normalized_input}")
-            ).first()
-            
-            if kota_data:
-                return {"kota": f"Kota {normalized_input}", "provinsi": kota_data.provinsi}
-            else:
-                return None
-        finally:
-            session.close()
-    
+        entry = gazetteer.best("kota", region_name)
+        if entry:
+            return {"kota": entry.name, "provinsi": entry.provinsi}
+        return None
+
     elif region_type == "kabupaten":
-        prefixes = ["kabupaten"]
-        
-        for prefix in prefixes:
-            if normalized_input.startswith(prefix):
-                normalized_input = normalized_input[len(prefix):].strip()
-                break
-        
-        session = SessionLocal()
-        try:
-            kabupaten_data = session.query(DataPanen).filter(
-                DataPanen.kabupaten.ilike(f"%{normalized_input}%")
-            ).first()
-            
-            if kabupaten_data:
-                return {"kabupaten": normalized_input, "provinsi": kabupaten_data.provinsi}
-            else:
-                return None
-        finally:
-            session.close()
-    
+        entry = gazetteer.best("kabupaten", region_name)
+        if entry:
+            return {"kabupaten": entry.name, "provinsi": entry.provinsi}
+        return None
+
     elif region_type == "kecamatan":
-        prefixes = ["kecamatan"]
-        
-        for prefix in prefixes:
-            if normalized_input.startswith(prefix):
-                normalized_input = normalized_input[len(prefix):].strip()
-                break
-        
-        session = SessionLocal()
-        try:
-            kecamatan_data = session.query(DataPanen).filter(
-                DataPanen.kecamatan.ilike(f"%{normalized_input}%")
-            ).first()
-            
-            if kecamatan_data:
-                return {
-                    "kecamatan": normalized_input,
-                    "kabupaten": kecamatan_data.kabupaten,
-                    "provinsi": kecamatan_data.provinsi
-                }
-            else:
-                return None
-        finally:
-            session.close()
-    
+        entry = gazetteer.best("kecamatan", region_name)
+        if entry:
+            return {
+                "kecamatan": entry.name,
+                "kabupaten": entry.kabupaten,
+                "provinsi": entry.provinsi
+            }
+        return None
+
     elif region_type == "nasional":
         return {"nasional": "Indonesia", "parent": None}
 
@@ -275,47 +251,446 @@ def get_parent_data(user_input: str):
         return None
 
 
+# Request Context
+_NOT_LOADED = object()
+
+
+@dataclass
+class RegionContext:
+    """Region resolved once per request, shared by every analysis and chart function."""
+    user_input: str
+    parent: Optional[dict]
+    _data_panen: object = field(default=_NOT_LOADED, repr=False)
+
+    @property
+    def data_panen(self) -> Optional[pd.DataFrame]:
+        """The region's data_panen rows, loaded on first access only."""
+        if self._data_panen is _NOT_LOADED:
+            self._data_panen = load_data_panen(self.parent)
+        return self._data_panen
+
+
+RegionInput = Union[str, RegionContext]
+
+
+def resolve_region(user_input: RegionInput) -> RegionContext:
+    """Resolve user input into a RegionContext, reusing one that is passed in."""
+    if isinstance(user_input, RegionContext):
+        return user_input
+    return RegionContext(user_input=user_input, parent=get_parent_data(user_input))
+
+
+def data_panen_mask(parent_data: Optional[dict]):
+    """Snapshot mask of the data_panen rows that belong to an already resolved region."""
+    if not parent_data:
+        return None
+
+    panen = snapshot.table("data_panen")
+    if 'kecamatan' in parent_data:
+        return panen.ilike("kecamatan", parent_data["kecamatan"])
+    elif 'kota' in parent_data:
+        return panen.ilike("kabupaten", parent_data["kota"])
+    elif 'kabupaten' in parent_data:
+        return panen.ilike("kabupaten", parent_data["kabupaten"])
+    elif 'provinsi' in parent_data:
+        return panen.ilike("provinsi", parent_data["provinsi"]) & panen.equals("kecamatan", "-")
+    elif 'nasional' in parent_data:
+        return panen.equals("kabupaten", "-") & panen.equals("kecamatan", "-")
+    return None
+
+
+def load_data_panen(parent_data: Optional[dict]):
+    """Load data_panen rows for an already resolved region."""
+    mask = data_panen_mask(parent_data)
+    if mask is None:
+        return None
+    return snapshot.table("data_panen").to_frame(mask)
+
+
+def data_panen_query(parent_data: Optional[dict]):
+    """SQL equivalent of load_data_panen, for reading rows straight from the database."""
+    if not parent_data:
+        return None
+
+    table = DataPanen.__table__
+    if 'kecamatan' in parent_data:
+        condition = table.c.kecamatan.ilike(parent_data["kecamatan"])
+    elif 'kota' in parent_data:
+        condition = table.c.kabupaten.ilike(parent_data["kota"])
+    elif 'kabupaten' in parent_data:
+        condition = table.c.kabupaten.ilike(parent_data["kabupaten"])
+    elif 'provinsi' in parent_data:
+        condition = table.c.provinsi.ilike(parent_data["provinsi"]) & (table.c.kecamatan == "-")
+    elif 'nasional' in parent_data:
+        condition = (table.c.kabupaten == "-") & (table.c.kecamatan == "-")
+    else:
+        return None
+
+    return select(table).where(condition).order_by(table.c.id)
+
+
+def iter_data_panen(parent_data: Optional[dict], chunk_size: int = 1000):
+    """Yield a region's data_panen rows in chunks from a server-side cursor."""
+    query = data_panen_query(parent_data)
+    if query is None:
+        return
+
+    # A dedicated connection: the rows are consumed after the request scope has ended
+    with checkout_connection() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(query)
+        for rows in result.mappings().partitions(chunk_size):
+            yield rows
+
+
 # Main Analysis Functions
-def get_data_panen(user_input: str):
+def get_data_panen(user_input: RegionInput):
     """Get agricultural data based on user input."""
-    parent_data = get_parent_data(user_input)
-    
+    return resolve_region(user_input).data_panen
+
+
+def page_data_panen(
+    user_input: RegionInput,
+    limit: int = 50,
+    sort: str = "id",
+    descending: bool = False,
+    after: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None,
+    ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+):
+    """One keyset page of a region's data_panen rows.
+
+    Filtering, sorting and projection run on the snapshot's column arrays; only the
+    rows of the page are materialized. ``after`` is the ``id`` of the last row of the
+    previous page and ``ranges`` maps numeric columns to inclusive (min, max) bounds.
+    Missing values sort last in both directions.
+    """
+    panen = snapshot.table("data_panen")
+    if sort not in PANEN_NUMERIC_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort}', use one of: {', '.join(PANEN_NUMERIC_COLUMNS)}")
+    columns = list(columns) if columns else panen.columns
+    unknown = [column for column in columns if column not in panen.columns]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    mask = data_panen_mask(resolve_region(user_input).parent)
+    if mask is None:
+        mask = np.zeros(len(panen), dtype=bool)
+
+    for column, (low, high) in (ranges or {}).items():
+        if column not in PANEN_NUMERIC_COLUMNS:
+            raise ValueError(f"Cannot filter on '{column}', use one of: {', '.join(PANEN_NUMERIC_COLUMNS)}")
+        values = panen.arrays[column]
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+
+    # Ascending sort key with missing values last; ties are broken by id
+    keys = panen.arrays[sort].astype("float64")
+    if descending:
+        keys = -keys
+    keys = np.where(np.isnan(keys), np.inf, keys)
+    ids = panen.arrays["id"]
+    total = int(mask.sum())
+
+    if after is not None:
+        position = np.searchsorted(ids, after)
+        if position >= len(ids) or ids[position] != after:
+            raise ValueError(f"Unknown cursor {after}")
+        last_key = keys[position]
+        mask &= (keys > last_key) | ((keys == last_key) & (ids > after))
+
+    rows = np.flatnonzero(mask)
+    has_more = len(rows) > limit
+    if has_more:
+        # Narrow to the rows that can be on this page before the full sort
+        cutoff = np.partition(keys[rows], limit - 1)[limit - 1]
+        rows = rows[keys[rows] <= cutoff]
+    rows = rows[np.lexsort((ids[rows], keys[rows]))][:limit]
+
+    return {
+        "rows": panen.take(rows, columns),
+        "total": total,
+        "next_cursor": int(ids[rows[-1]]) if has_more else None,
+    }
+
+
+def panen_metric(metric: str) -> np.ndarray:
+    """Values of a numeric column, a derived ratio, or a "numerator/denominator" column ratio."""
+    panen = snapshot.table("data_panen")
+
+    def total(columns):
+        unknown = [column for column in columns if column not in PANEN_METRIC_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown metric column: {', '.join(unknown)}")
+        return sum(panen.arrays[column].astype("float64") for column in columns)
+
+    if metric in PANEN_RATIO_METRICS:
+        numerator, denominator = PANEN_RATIO_METRICS[metric]
+    elif "/" in metric:
+        numerator, denominator = ([part.strip()] for part in metric.split("/", 1))
+    else:
+        numerator, denominator = [metric], None
+
+    values = total(numerator)
+    if denominator is not None:
+        divisor = total(denominator)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(divisor != 0, values / divisor, np.nan)
+    return values
+
+
+def rank_regions(
+    user_input: RegionInput = "indonesia",
+    metric: str = "panen",
+    level: Optional[str] = None,
+    k: int = 10,
+    descending: bool = True,
+    per_parent: bool = False,
+):
+    """Top ``k`` regions below ``user_input`` by any metric, overall or within each parent.
+
+    ``level`` defaults to the level directly below the resolved region. Rows without a
+    value for the metric (e.g. a ratio with a zero denominator) are left out. Selection
+    uses np.argpartition, and the per-parent ranking is a single grouped sort.
+    """
+    parent_data = resolve_region(user_input).parent
+    if not parent_data:
+        return pd.DataFrame()
+    if k < 1:
+        raise ValueError("k must be at least 1")
+
+    if level is None:
+        if 'nasional' in parent_data:
+            level = "provinsi"
+        elif 'kecamatan' in parent_data or 'kota' in parent_data or 'kabupaten' in parent_data:
+            level = "kecamatan"
+        else:
+            level = "kabupaten"
+    if level not in RANK_LEVELS:
+        raise ValueError(f"Unknown level '{level}', use one of: {', '.join(RANK_LEVELS)}")
+
+    panen = snapshot.table("data_panen")
+    no_kabupaten = panen.equals("kabupaten", "-")
+    no_kecamatan = panen.equals("kecamatan", "-")
+    if level == "provinsi":
+        mask = no_kabupaten & no_kecamatan
+    elif level == "kabupaten":
+        mask = ~no_kabupaten & no_kecamatan
+    else:
+        mask = ~no_kecamatan
+
+    # Restrict to the requested region
+    if 'kecamatan' in parent_data:
+        mask &= panen.ilike("kecamatan", parent_data["kecamatan"])
+    elif 'kota' in parent_data or 'kabupaten' in parent_data:
+        mask &= panen.ilike("kabupaten", parent_data.get("kota") or parent_data["kabupaten"])
+    elif 'provinsi' in parent_data:
+        mask &= panen.ilike("provinsi", parent_data["provinsi"])
+
+    values = panen_metric(metric)
+    mask &= ~np.isnan(values)
+    rows = np.flatnonzero(mask)
+
+    # Ascending key; ties keep the table order
+    keys = -values[rows] if descending else values[rows]
+    parent_level = RANK_PARENT_LEVEL[level] if per_parent else None
+
+    if parent_level is None:
+        if len(rows) > k:
+            # Keep every row tied with the k-th key so the table order decides among them
+            cutoff = np.partition(keys, k - 1)[k - 1]
+            rows, keys = rows[keys <= cutoff], keys[keys <= cutoff]
+        order = np.lexsort((rows, keys))[:k]
+        rows = rows[order]
+        ranks = np.arange(1, len(rows) + 1)
+    else:
+        # Parent group id; kabupaten names are only unique within a provinsi
+        groups = panen.arrays["provinsi"][rows].astype("int64")
+        if parent_level == "kabupaten":
+            groups = groups * (len(panen.categories["kabupaten"]) + 1) + panen.arrays["kabupaten"][rows]
+        order = np.lexsort((rows, keys, groups))
+        rows, groups = rows[order], groups[order]
+        starts = np.r_[0, np.flatnonzero(groups[1:] != groups[:-1]) + 1]
+        ranks = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)])) + 1
+        keep = ranks <= k
+        rows, ranks = rows[keep], ranks[keep]
+
+    columns = list(RANK_LEVELS[:RANK_LEVELS.index(level) + 1])
+    df = panen.take(rows, columns)
+    df[metric] = panen.arrays[metric][rows] if metric in PANEN_METRIC_COLUMNS else values[rows]
+    df["rank"] = ranks
+    return df
+
+
+# Island (pulau) dimension, joined to each snapshot table once per load
+PULAU_GROUP = "pulau"
+
+
+def build_pulau_index(snap: DataSnapshot) -> Tuple[np.ndarray, Dict[str, int]]:
+    """Sorted pulau names, and the pulau code of every normalized provinsi spelling."""
+    dimension = snap.table("region_pulau").to_frame()
+    names, codes = np.unique(dimension["pulau"].to_numpy(dtype=str), return_inverse=True)
+    return names.astype(object), dict(zip(dimension["provinsi"].map(normalize_name), codes.tolist()))
+
+
+def get_pulau_index() -> Tuple[np.ndarray, Dict[str, int]]:
+    return snapshot.derived("pulau", build_pulau_index)
+
+
+def pulau_codes(table_name: str) -> np.ndarray:
+    """Pulau code of every row of a snapshot table with a provinsi column (-1 when unknown)."""
+    def build(snap: DataSnapshot) -> np.ndarray:
+        _, lookup = get_pulau_index()
+        table = snap.table(table_name)
+        by_category = np.array(
+            [lookup.get(normalize_name(name), -1) for name in table.categories["provinsi"]] + [-1], dtype="int64"
+        )
+        # Category code -1 (missing provinsi) picks the trailing -1
+        return by_category[table.arrays["provinsi"]]
+    return snapshot.derived(f"pulau:{table_name}", build)
+
+
+def sum_by_pulau(table_name: str, mask: np.ndarray, columns: Sequence[str]) -> pd.DataFrame:
+    """Sum ``columns`` over the masked rows of a snapshot table per pulau, in one np.add.at pass."""
+    names, _ = get_pulau_index()
+    table = snapshot.table(table_name)
+    codes = pulau_codes(table_name)
+    rows = np.flatnonzero(mask & (codes >= 0))
+
+    values = np.column_stack([np.nan_to_num(table.arrays[column][rows]) for column in columns])
+    totals = np.zeros((len(names), len(columns)), dtype=values.dtype)
+    np.add.at(totals, codes[rows], values)
+    present = np.bincount(codes[rows], minlength=len(names)) > 0
+
+    df = pd.DataFrame(totals[present], columns=list(columns))
+    df.insert(0, PULAU_GROUP, names[present])
+    return df
+
+
+def pulau_region_mask(table_name: str, parent: dict) -> np.ndarray:
+    """Rows of a provinsi-keyed table on the region's pulau; the whole table for the nation.
+
+    A pulau row always totals the whole island, so a provinsi or kabupaten selects its island.
+    """
+    table = snapshot.table(table_name)
+    if 'nasional' in parent or not parent.get('provinsi'):
+        return table.all()
+    _, lookup = get_pulau_index()
+    code = lookup.get(normalize_name(parent['provinsi']), -1)
+    if code < 0:
+        return np.zeros(len(table), dtype=bool)
+    return pulau_codes(table_name) == code
+
+
+def get_total_data_panen_by_pulau(user_input: RegionInput):
+    """Harvest totals per pulau, from the provinsi aggregate rows."""
+    parent_data = resolve_region(user_input).parent
     if not parent_data:
         return None
-    
+    return sum_by_pulau("mv_panen_provinsi", pulau_region_mask("mv_panen_provinsi", parent_data), PANEN_METRIC_COLUMNS)
+
+
+def get_efektifitas_alsintan_by_pulau(user_input: RegionInput):
+    """Alsintan effectiveness per pulau, most effective first."""
+    parent_data = resolve_region(user_input).parent
+    if not parent_data:
+        return pd.DataFrame()
+    df = sum_by_pulau(
+        "mv_panen_provinsi", pulau_region_mask("mv_panen_provinsi", parent_data),
+        ["panen", "alsintan_september", "alsintan_oktober", "luas_baku_sawah"]
+    )
+    df["total_alsintan"] = df.pop("alsintan_september") + df.pop("alsintan_oktober")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["efektivitas_hasil"] = np.where(df["total_alsintan"] > 0, df["panen"] / df["total_alsintan"], 0.0)
+        df["efektivitas_luas"] = np.where(df["total_alsintan"] > 0, df.pop("luas_baku_sawah") / df["total_alsintan"], 0.0)
+    return df.sort_values("efektivitas_hasil", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def get_data_ksa_by_pulau(user_input: RegionInput, bulan: str = "September", tahun: Optional[int] = None):
+    """KSA totals per pulau for one month, of the latest year by default."""
+    parent_data = resolve_region(user_input).parent
+    if not parent_data:
+        return pd.DataFrame()
+    ksa = snapshot.table("mv_ksa_provinsi")
+    if tahun is None:
+        tahun = int(ksa.arrays["tahun"].max()) if len(ksa) else None
+    mask = ksa.equals("bulan", bulan) & (ksa.arrays["tahun"] == tahun) & pulau_region_mask("mv_ksa_provinsi", parent_data)
+    return sum_by_pulau("mv_ksa_provinsi", mask, ["luas_panen", "produksi_beras", "produksi_padi"])
+
+
+def get_data_iklim_by_pulau(user_input: RegionInput, bulan2="September"):
+    """Climate readings of one month summed per pulau."""
+    parent_data = resolve_region(user_input).parent
+    if not parent_data:
+        return pd.DataFrame()
+    iklim = snapshot.table("data_iklim")
+    mask = iklim.isin("bulan", [bulan2]) & pulau_region_mask("data_iklim", parent_data)
+    return sum_by_pulau("data_iklim", mask, CLIMATE_PARAMETERS)
+
+
+def get_rollup_cube() -> RollupCube:
+    """Rollup of every metric at each level, built once per snapshot load."""
+    return snapshot.derived("rollup", lambda snap: RollupCube.from_table(
+        snap.table("data_panen"), PANEN_METRIC_COLUMNS
+    ))
+
+
+def rollup_path(parent_data: dict) -> Tuple[str, ...]:
+    """(provinsi, kabupaten, kecamatan) prefix of a resolved region in the rollup cube."""
+    if 'nasional' in parent_data:
+        return ()
     if 'kecamatan' in parent_data:
-        return get_data_by_kecamatan(parent_data["kecamatan"])
-    elif ('kota' in parent_data or 'kabupaten' in parent_data) and 'kecamatan' not in parent_data:
-        if "kota" in parent_data:
-            return get_data_by_kabupaten_kota(parent_data["kota"])
-        elif "kabupaten" in parent_data:
-            return get_data_by_kabupaten_kota(parent_data["kabupaten"])
-    elif 'provinsi' in parent_data and 'kabupaten' not in parent_data and 'kecamatan' not in parent_data:
-        return get_data_by_provinsi(parent_data["provinsi"])
-    elif 'nasional' in parent_data:
-        return get_data_nasional()
+        return (parent_data['provinsi'], parent_data['kabupaten'], parent_data['kecamatan'])
+    if 'kota' in parent_data or 'kabupaten' in parent_data:
+        return (parent_data['provinsi'], parent_data.get('kota') or parent_data['kabupaten'])
+    return (parent_data['provinsi'],)
+
+
+def get_rollup(user_input: RegionInput = "indonesia"):
+    """A region's rolled-up totals and the totals of each region directly below it."""
+    parent_data = resolve_region(user_input).parent
+    if not parent_data:
+        return None
+
+    cube = get_rollup_cube()
+    path = rollup_path(parent_data)
+    node = cube.node(path)
+    if node is None:
+        return None
+    return {"node": node, "children": cube.children(path)}
 
 
-def get_total_data_panen(user_input: str):
+def get_total_data_panen(user_input: RegionInput):
     """Get total agricultural data based on user input."""
-    parent_data = get_parent_data(user_input)
+    ctx = resolve_region(user_input)
+    parent_data = ctx.parent
+    if not parent_data:
+        return None
+
+    # Totals come from the aggregates precomputed at ingest
     if 'nasional' in parent_data:
-        df = get_data_nasional()
-        columns_to_sum = [
-            "perkiraan_panen_september", "perkiraan_panen_oktober",
-            "alsintan_september", "alsintan_oktober", "bera", "penggenangan",
-            "tanam", "vegetatif_1", "vegetatif_2", "max_vegetatif",
-            "generatif_1", "generatif_2", "panen", "standing_crop", "luas_baku_sawah"
-        ]
-        total = df[columns_to_sum].sum()
-        total_df = pd.DataFrame([total], columns=columns_to_sum)
-        return total_df
+        totals = snapshot.table("mv_panen_nasional")
+        return totals.to_frame(columns=PANEN_METRIC_COLUMNS)
 
-    df = get_data_panen(user_input)
-    return df.head(1) if df is not None else None
+    if 'kecamatan' in parent_data:
+        df = ctx.data_panen
+        return df.head(1) if df is not None else None
+
+    if 'kota' in parent_data or 'kabupaten' in parent_data:
+        totals = snapshot.table("mv_panen_kabupaten")
+        kabupaten = parent_data.get('kota') or parent_data.get('kabupaten')
+        mask = totals.ilike("kabupaten", kabupaten) & totals.equals("provinsi", parent_data['provinsi'])
+    else:
+        totals = snapshot.table("mv_panen_provinsi")
+        mask = totals.ilike("provinsi", parent_data['provinsi'])
 
+    return totals.to_frame(mask).head(1)
 
-def get_wilayah_panen_tertinggi(user_input: str):
+
+def get_wilayah_panen_tertinggi(user_input: RegionInput):
     """Get regions with highest harvest data."""
     data_to_process = get_data_panen(user_input)
     if data_to_process is None or len(data_to_process) <= 1:
@@ -324,84 +699,76 @@ def get_wilayah_panen_tertinggi(user_input: str):
     data_to_process = data_to_process[1:]
 
     if (data_to_process['kecamatan'] != '-').any():
-        wilayah = data_to_process[['kecamatan', 'panen']].sort_values(by='panen', ascending=False)
+        state = 'kecamatan'
     elif (data_to_process['kabupaten'] != '-').any():
-        wilayah = data_to_process[['kabupaten', 'panen']].sort_values(by='panen', ascending=False)
+        state = 'kabupaten'
     elif (data_to_process['provinsi'] != '-').any():
-        wilayah = data_to_process[['provinsi', 'panen']].sort_values(by='panen', ascending=False)
+        state = 'provinsi'
     else:
         return pd.DataFrame()
 
-    return wilayah.head(10)
+    # Partial selection of the top 10 instead of sorting every row
+    return data_to_process[[state, 'panen']].nlargest(10, 'panen')
 
 
-def get_wilayah_efektifitas_alsintan(user_input: str):
+def get_wilayah_efektifitas_alsintan(user_input: RegionInput):
     """Get regions with highest agricultural machinery effectiveness."""
-    parent_data = get_parent_data(user_input)
+    ctx = resolve_region(user_input)
+    parent_data = ctx.parent
     
     if not parent_data:
         return pd.DataFrame()
 
     if 'kecamatan' in parent_data:
-        df = get_data_panen(user_input)
+        df = ctx.data_panen
     elif 'nasional' in parent_data:
-        df = get_data_panen(user_input)
+        df = ctx.data_panen
     else:
-        df = get_data_panen(user_input)
+        df = ctx.data_panen
         if df is not None and len(df) > 1:
             df = df[1:]
 
     if df is None or df.empty:
         return pd.DataFrame()
 
-    # Ensure numeric columns are correct
-    numeric_cols = ['alsintan_september', 'alsintan_oktober', 'luas_baku_sawah', 'panen']
-    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-
-    # Calculate total alsintan
-    df['total_alsintan'] = df['alsintan_september'] + df['alsintan_oktober']
-    
-    # Avoid division by zero
-    df['total_alsintan'] = df['total_alsintan'].replace(0, pd.NA)
-    
-    # Calculate effectiveness
-    df['efektivitas_luas'] = (df['luas_baku_sawah'] / df['total_alsintan']).fillna(0)
-    df['efektivitas_hasil'] = (df['panen'] / df['total_alsintan']).fillna(0)
-    
-    # Remove rows with zero or null total_alsintan
+    # Effectiveness is precomputed per row at ingest; keep only rows with alsintan
+    efektivitas = snapshot.table("mv_panen_efektivitas")
+    df = efektivitas.to_frame(efektivitas.isin("id", df["id"]))
     df = df[df['total_alsintan'].notna() & (df['total_alsintan'] > 0)]
+    df = df.astype({'total_alsintan': 'int64'})
     
     # Get top 10 most effective regions
     top10_efektif = (
-        df.sort_values(by='efektivitas_hasil', ascending=False)
+        df.nlargest(10, 'efektivitas_hasil')
             [['provinsi', 'kabupaten', 'kecamatan', 'panen', 'total_alsintan', 'efektivitas_hasil']]
-            .head(10)
             .reset_index(drop=True)
     )
 
     return top10_efektif
 
 
-def get_prompt_ringkasan_data_panen(user_input: str):
+def get_prompt_ringkasan_data_panen(user_input: RegionInput):
     """Generate a summary prompt for agricultural data."""
+    ctx = resolve_region(user_input)
+
     # Get total agricultural data
-    total_df = get_total_data_panen(user_input)
+    total_df = get_total_data_panen(ctx)
     if total_df is None or total_df.empty:
         return "Data tidak ditemukan untuk wilayah tersebut."
     
     total_summary = total_df.to_dict(orient='records')[0]
 
     # Get top 5 regions with highest harvest
-    wilayah_tertinggi = get_wilayah_panen_tertinggi(user_input)
+    wilayah_tertinggi = get_wilayah_panen_tertinggi(ctx)
     top_wilayah = wilayah_tertinggi.head(5).to_dict(orient='records') if not wilayah_tertinggi.empty else []
 
     # Get top 5 most effective regions in using agricultural machinery
-    efektifitas_df = get_wilayah_efektifitas_alsintan(user_input)
+    efektifitas_df = get_wilayah_efektifitas_alsintan(ctx)
     top_efektif = efektifitas_df.head(5).to_dict(orient='records') if not efektifitas_df.empty else []
 
     # Build summary narrative
     prompt = f"""
-**Analisis Data Panen Wilayah: {user_input.upper()}**
+**Analisis Data Panen Wilayah: {ctx.user_input.upper()}**
 
 **1. Total Data Panen**
 - Panen September: {total_summary.get('perkiraan_panen_september', 0):,} ha
@@ -426,10 +793,9 @@ def get_prompt_ringkasan_data_panen(user_input: str):
     return prompt.strip()
 
 
-def get_data_iklim(user_input: str, bulan2="September"):
+def get_data_iklim(user_input: RegionInput, bulan2="September"):
     """Get climate data based on user input."""
-    session = SessionLocal()
-    parent = get_parent_data(user_input)
+    parent = resolve_region(user_input).parent
 
     if not parent:
         return pd.DataFrame()
@@ -442,111 +808,257 @@ def get_data_iklim(user_input: str, bulan2="September"):
         input_val = ""
         state = "nasional"
 
-    try:
-        query = session.query(Iklim).filter(Iklim.bulan.in_([bulan2]))
-        if state == "provinsi":
-            query = query.filter(Iklim.provinsi.ilike(f"%{input_val}%"))
-        
-        df = pd.read_sql(query.statement, session.bind)
-
-        if state == "nasional":
-            columns_to_sum = ['curah_hujan', 'suhu', 'kelembaban', 'lama_penyinaran']
-            summary_per_province = df.groupby('provinsi')[columns_to_sum].sum().reset_index()
-            return summary_per_province
-        
-        df.drop(columns=['bulan'], inplace=True)
-        return df
-    
-    finally:
-        session.close()
+    iklim = snapshot.table("data_iklim")
+    mask = iklim.isin("bulan", [bulan2])
+    if state == "provinsi":
+        mask &= iklim.ilike("provinsi", f"%{input_val}%")
+
+    df = iklim.to_frame(mask)
+
+    if state == "nasional":
+        columns_to_sum = ['curah_hujan', 'suhu', 'kelembaban', 'lama_penyinaran']
+        summary_per_province = df.groupby('provinsi')[columns_to_sum].sum().reset_index()
+        return summary_per_province
+
+    df.drop(columns=['bulan'], inplace=True)
+    return df
 
 
-def get_data_ksa(user_input: str):
-    """Get KSA (agricultural statistics) data based on user input."""
-    session = SessionLocal()
-    parent = get_parent_data(user_input)
+def get_climate_series_index() -> ClimateSeries:
+    """Dense station x month x parameter climate array, built once per snapshot load."""
+    return snapshot.derived("climate_series", lambda snap: ClimateSeries.from_table(snap.table("data_iklim")))
 
+
+CLIMATE_GROUPS = ("stasiun", "provinsi", "pulau", "nasional")
+
+
+def get_climate_series(
+    user_input: RegionInput = "indonesia",
+    start=None,
+    end=None,
+    group_by: Optional[str] = None,
+    agg: str = "sum",
+):
+    """Climate readings for a month range, per station or aggregated per provinsi, pulau or nation.
+
+    Returns ``values`` as a dense place x month x parameter array (null where there is no
+    reading). Without ``group_by``, a provinsi region is listed per station and the nation
+    per provinsi, as in get_data_iklim.
+    """
+    parent = resolve_region(user_input).parent
     if not parent:
-        return pd.DataFrame()
+        return None
 
-    try:
-        if 'kecamatan' in parent:
-            input_val = parent['kabupaten']
-            query = session.query(KSA).filter(KSA.kabupaten.ilike(f"%{input_val}%")).filter(KSA.bulan.in_(["September"]))
-        elif 'kabupaten' in parent:
-            input_val = parent['kabupaten']
-            query = session.query(KSA).filter(KSA.kabupaten.ilike(f"%{input_val}%")).filter(KSA.bulan.in_(["September"]))
-        elif 'kota' in parent:
-            input_val = parent['kota']
-            query = session.query(KSA).filter(KSA.kabupaten.ilike(f"%{input_val}%")).filter(KSA.bulan.in_(["September"]))
-        elif 'provinsi' in parent:
-            input_val = parent['provinsi']
-            query = session.query(KSA).filter(KSA.provinsi.ilike(f"%{input_val}%")).filter(KSA.bulan.in_(["September"]))
+    months = month_range(start, end)
+    provinsi = parent.get('provinsi') or ""
+    if group_by is None:
+        group_by = "stasiun" if provinsi else "provinsi"
+    if group_by not in CLIMATE_GROUPS:
+        raise ValueError(f"Unknown group_by '{group_by}', use one of: {', '.join(CLIMATE_GROUPS)}")
+
+    series = get_climate_series_index()
+    iklim = snapshot.table("data_iklim")
+    if provinsi:
+        stations = np.unique(iklim.arrays["stasiun"][iklim.ilike("provinsi", f"%{provinsi}%")])
+    else:
+        stations = np.arange(len(series.stations))
+    values = series.select(stations, months)
+
+    if group_by == "stasiun":
+        places = series.stations[stations]
+    else:
+        if group_by == "provinsi":
+            keys = series.provinsi[stations]
+        elif group_by == "pulau":
+            names, lookup = get_pulau_index()
+            codes = np.array([lookup.get(normalize_name(name), -1) for name in series.provinsi[stations]], dtype="int64")
+            known = codes >= 0
+            keys, values = names[codes[known]], values[known]
         else:
-            query = session.query(KSA).filter(KSA.bulan.in_(["September"]))
-            
-        df = pd.read_sql(query.statement, session.bind)
-        return df
-    finally:
-        session.close()
+            keys = np.full(len(stations), "Indonesia", dtype=object)
+        places, groups = np.unique(keys.astype(str), return_inverse=True)
+        values = ClimateSeries.aggregate(values, groups, len(places), agg)
+
+    return {
+        "group_by": group_by,
+        "aggregate": None if group_by == "stasiun" else agg,
+        "places": places.tolist(),
+        "months": [BULAN[month] for month in months],
+        "parameters": CLIMATE_PARAMETERS,
+        "values": np.where(np.isnan(values), None, values).tolist(),
+    }
+
+
+def ksa_region_mask(ksa, parent: dict):
+    """Mask of the KSA rows (data_ksa or mv_ksa_*) that belong to a resolved region."""
+    mask = ksa.all()
+    if 'kabupaten' in ksa.arrays:
+        if 'kecamatan' in parent or 'kabupaten' in parent:
+            return mask & ksa.ilike("kabupaten", f"%{parent['kabupaten']}%")
+        if 'kota' in parent:
+            return mask & ksa.ilike("kabupaten", f"%{parent['kota']}%")
+    if 'provinsi' in parent:
+        mask &= ksa.ilike("provinsi", f"%{parent['provinsi']}%")
+    return mask
+
+
+def get_data_ksa(user_input: RegionInput, bulan: str = "September", tahun: Optional[int] = None):
+    """Get KSA (agricultural statistics) data based on user input, for one month of the latest year by default."""
+    parent = resolve_region(user_input).parent
+
+    if not parent:
+        return pd.DataFrame()
+
+    ksa = snapshot.table("data_ksa")
+    if tahun is None:
+        tahun = int(ksa.arrays["tahun"].max()) if len(ksa) else None
+    mask = ksa.isin("bulan", [bulan]) & (ksa.arrays["tahun"] == tahun)
+    mask &= ksa_region_mask(ksa, parent)
+
+    return ksa.to_frame(mask)
+
+
+KSA_LEVELS = ("provinsi", "kabupaten")
+
+
+def ksa_period(value) -> int:
+    """Period number (tahun * 12 + month - 1) of "2025-03", "2025-3" or "Maret 2025"."""
+    text = str(value).strip()
+    if "-" in text:
+        tahun, bulan = text.split("-", 1)
+    else:
+        bulan, _, tahun = text.rpartition(" ")
+    if not tahun.strip().isdigit():
+        raise ValueError(f"Unknown period '{value}', use YYYY-MM or '<bulan> <tahun>'")
+    return int(tahun) * 12 + month_index(bulan)
+
+
+def get_ksa_periods(
+    user_input: RegionInput = "indonesia",
+    start=None,
+    end=None,
+    level: Optional[str] = None,
+):
+    """KSA rows for a range of months with their precomputed month-over-month and year-over-year deltas.
+
+    Rows come from the mv_ksa_* views refreshed at ingest, per kabupaten/kota or per provinsi
+    (default: per provinsi for indonesia, per kabupaten/kota otherwise), ordered by region and period.
+    """
+    parent = resolve_region(user_input).parent
+    if not parent:
+        return pd.DataFrame()
+
+    if level is None:
+        level = "provinsi" if 'nasional' in parent else "kabupaten"
+    if level not in KSA_LEVELS:
+        raise ValueError(f"Unknown level '{level}', use one of: {', '.join(KSA_LEVELS)}")
+
+    ksa = snapshot.table(f"mv_ksa_{level}")
+    mask = ksa_region_mask(ksa, parent)
+    periods = ksa.arrays["periode"]
+    if start is not None:
+        mask &= periods >= ksa_period(start)
+    if end is not None:
+        mask &= periods <= ksa_period(end)
+
+    rows = np.flatnonzero(mask)
+    # Category codes are in name order, so sorting on them sorts by name
+    keys = [ksa.arrays[column][rows] for column in KSA_LEVELS[:KSA_LEVELS.index(level) + 1]]
+    rows = rows[np.lexsort([periods[rows]] + keys[::-1])]
+    return ksa.take(rows)
+
+
+def build_ksa_join(snap: DataSnapshot) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Crosswalk id of every SIMOTANDI total row and KSA row, per level (-1 without a match)."""
+    crosswalk = snap.table("region_crosswalk").to_frame()
+    join = {}
+    for level, names in (("provinsi", ["provinsi"]), ("kabupaten", ["provinsi", "kabupaten"])):
+        pairs = crosswalk[crosswalk["level"] == level]
+        keys = []
+        for source, table in (("panen", f"mv_panen_{level}"), ("ksa", f"mv_ksa_{level}")):
+            rows = snap.table(table).to_frame(columns=names)
+            lookup = pairs.rename(columns={f"{source}_{name}": name for name in names})[names + ["id"]]
+            ids = rows.merge(lookup, on=names, how="left")["id"]
+            keys.append(ids.fillna(-1).to_numpy(dtype="int64"))
+        join[level] = tuple(keys)
+    return join
+
+
+def get_harvest_ksa_comparison(user_input: RegionInput = "indonesia", bulan: str = "September", tahun: Optional[int] = None):
+    """SIMOTANDI harvest next to KSA figures for the same regions, with their difference and ratio.
+
+    Regions are the provinsi of the nation or the kabupaten/kota of a provinsi (a kabupaten,
+    kota or kecamatan gives its own kabupaten/kota). Both sides are joined on the integer
+    crosswalk id built at ingest; KSA figures are for ``bulan`` of the latest year by default.
+    """
+    parent = resolve_region(user_input).parent
+    if not parent:
+        return pd.DataFrame()
+
+    level = "provinsi" if 'nasional' in parent else "kabupaten"
+    panen_keys, ksa_keys = snapshot.derived("ksa_join", build_ksa_join)[level]
+    panen = snapshot.table(f"mv_panen_{level}")
+    ksa = snapshot.table(f"mv_ksa_{level}")
+
+    if 'nasional' in parent:
+        mask = panen.all()
+    elif 'kota' in parent or 'kabupaten' in parent:
+        kabupaten = parent.get('kota') or parent.get('kabupaten')
+        mask = panen.ilike("kabupaten", kabupaten) & panen.equals("provinsi", parent['provinsi'])
+    else:
+        mask = panen.equals("provinsi", parent['provinsi'])
+    rows = np.flatnonzero(mask)
+
+    # KSA values by crosswalk id for the chosen month; ids without a KSA row stay NaN
+    if tahun is None:
+        tahun = int(ksa.arrays["tahun"].max()) if len(ksa) else None
+    ksa_rows = np.flatnonzero(ksa.equals("bulan", bulan) & (ksa.arrays["tahun"] == tahun) & (ksa_keys >= 0))
+    size = max(int(panen_keys.max(initial=-1)), int(ksa_keys.max(initial=-1))) + 1
+    keys = panen_keys[rows]
+    matched = keys >= 0
+
+    df = panen.take(rows, ["provinsi", "kabupaten"] if level == "kabupaten" else ["provinsi"])
+    df["panen"] = panen.arrays["panen"][rows]
+    for column in ("luas_panen", "produksi_padi", "produksi_beras"):
+        by_key = np.full(size, np.nan)
+        by_key[ksa_keys[ksa_rows]] = ksa.arrays[column][ksa_rows]
+        df[column] = np.where(matched, by_key[np.where(matched, keys, 0)], np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["selisih_luas_panen"] = df["panen"] - df["luas_panen"]
+        df["rasio_luas_panen"] = np.where(df["luas_panen"] > 0, df["panen"] / df["luas_panen"], np.nan)
+    return df.sort_values("panen", ascending=False, kind="stable").reset_index(drop=True)
 
 
 # Chart Functions
-def chart_one(user_input: str = "indonesia"):
+def chart_one(user_input: RegionInput = "indonesia"):
     """Generate chart data for climate visualization."""
-    df = get_data_iklim(user_input)
+    ctx = resolve_region(user_input)
+
+    # The nation is shown per pulau, a provinsi per station
+    if ctx.parent and not ctx.parent.get('provinsi'):
+        df = get_data_iklim_by_pulau(ctx)
+        return df.rename(columns={'pulau': 'tempat'})
+
+    df = get_data_iklim(ctx)
     
     if df.empty:
         return pd.DataFrame()
     
-    if 'stasiun' not in df.columns:
-        state = 'provinsi'
-    else:
-        state = 'stasiun'
-    
     df = df[[
-        state,
+        'stasiun',
         'curah_hujan',
         'suhu',
         'kelembaban',
         'lama_penyinaran',
     ]].copy()
 
-    df.rename(columns={state: 'tempat'}, inplace=True)
-
-    if state == 'provinsi':
-        pulau_mapping = {
-            'Aceh': 'Sumatera', 'Sumatera Utara': 'Sumatera', 'Sumatera Barat': 'Sumatera',
-            'Riau': 'Sumatera', 'Kepulauan Riau': 'Sumatera', 'Jambi': 'Sumatera',
-            'Bengkulu': 'Sumatera', 'Lampung': 'Sumatera', 'Sumatera Selatan': 'Sumatera',
-            'Bangka Belitung': 'Sumatera',
-
-            'Banten': 'Jawa', 'DKI Jakarta': 'Jawa', 'Jawa Barat': 'Jawa',
-            'Jawa Tengah': 'Jawa', 'DI Yogyakarta': 'Jawa', 'Jawa Timur': 'Jawa',
-
-            'Bali': 'Bali & Nusa Tenggara', 'NTB': 'Bali & Nusa Tenggara', 'NTT': 'Bali & Nusa Tenggara',
-
-            'Kalimantan Barat': 'Kalimantan', 'Kalimantan Tengah': 'Kalimantan',
-            'Kalimantan Selatan': 'Kalimantan', 'Kalimantan Timur': 'Kalimantan',
-            'Kalimantan Utara': 'Kalimantan',
-
-            'Sulawesi Utara': 'Sulawesi', 'Sulawesi Tengah': 'Sulawesi',
-            'Sulawesi Selatan': 'Sulawesi', 'Sulawesi Tenggara': 'Sulawesi',
-            'Sulawesi Barat': 'Sulawesi', 'Gorontalo': 'Sulawesi',
-
-            'Maluku': 'Maluku & Papua', 'Maluku Utara': 'Maluku & Papua',
-            'Papua': 'Maluku & Papua', 'Papua Barat': 'Maluku & Papua'
-        }
-
-        df['pulau'] = df['tempat'].map(pulau_mapping)
-        df = df.groupby('pulau', as_index=False).sum()
-        df.drop(columns=['tempat'], inplace=True)
-        df.rename(columns={'pulau': 'tempat'}, inplace=True)
+    df.rename(columns={'stasiun': 'tempat'}, inplace=True)
 
     return df
 
 
-def chart_two(user_input: str = "indonesia"):
+def chart_two(user_input: RegionInput = "indonesia"):
     """Generate chart data for harvest regions visualization."""
     df = get_wilayah_panen_tertinggi(user_input)
 
@@ -566,18 +1078,19 @@ def chart_two(user_input: str = "indonesia"):
     return df
 
 
-def chart_three(user_input: str = "indonesia"):
+def chart_three(user_input: RegionInput = "indonesia"):
     """Generate chart data for harvest vs KSA comparison."""
-    df_panen = get_wilayah_panen_tertinggi(user_input)
-    df_ksa = get_data_ksa(user_input)
+    ctx = resolve_region(user_input)
+    df_panen = get_wilayah_panen_tertinggi(ctx)
+    df_ksa = get_data_ksa(ctx)
 
     if not df_ksa.empty:
         df_ksa = df_ksa.sort_values(by='produksi_padi', ascending=False).head(10)
 
-    return df_panen, df_ksa
+    return df_panen, df_ksa, get_harvest_ksa_comparison(ctx)
 
 
-def chart_four(user_input: str = "indonesia"):
+def chart_four(user_input: RegionInput = "indonesia"):
     """Generate chart data for agricultural machinery effectiveness."""
     df = get_wilayah_efektifitas_alsintan(user_input)
 
@@ -599,7 +1112,7 @@ def chart_four(user_input: str = "indonesia"):
     return df
 
 
-def chart_five(user_input: str = "indonesia"):
+def chart_five(user_input: RegionInput = "indonesia"):
     """Generate chart data for general agricultural data."""
     df = get_data_panen(user_input)
     return df if df is not None else pd.DataFrame()
\ No newline at end of file
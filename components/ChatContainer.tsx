@@ -98,7 +98,7 @@ function ChatContainer() {
 			console.log("Sending request to:", apiUrl);
 			console.log("Message:", currentInput);
 
-			const response = await fetch(`${apiUrl}/api/chat`, {
+			const response = await fetch(`${apiUrl}/api/chat/stream`, {
 				method: "POST",
 				headers: {
 					"Content-Type": "application/json",
@@ -109,7 +109,7 @@ function ChatContainer() {
 			console.log("Response status:", response.status);
 			console.log("Response ok:", response.ok);
 
-			if (!response.ok) {
+			if (!response.ok || !response.body) {
 				const errorText = await response.text();
 				console.error("Error response:", errorText);
 				throw new Error(
@@ -117,20 +117,71 @@ function ChatContainer() {
 				);
 			}
 
-			const data = await response.json();
-			console.log("Response data:", data);
+			const botId = (Date.now() + 1).toString();
+			let botText = "";
+			let answered = false;
 
-			// Hapus pesan loading dan tambahkan respons bot
-			setMessages((prev) => {
-				const withoutLoading = prev.filter((msg) => msg.id !== "loading");
-				const botMessage: Message = {
-					id: (Date.now() + 1).toString(),
-					text: data.data.response, // Access the nested response field
-					isUser: false,
-					timestamp: new Date(),
-				};
-				return [...withoutLoading, botMessage];
-			});
+			// Ganti indikator loading dengan pesan bot (atau perbarui statusnya)
+			const showBotText = (text: string) => {
+				setMessages((prev) => {
+					const withoutLoading = prev.filter(
+						(msg) => msg.id !== "loading" && msg.id !== botId,
+					);
+					const botMessage: Message = {
+						id: botId,
+						text,
+						isUser: false,
+						timestamp: new Date(),
+					};
+					return [...withoutLoading, botMessage];
+				});
+			};
+			const showStatus = (text: string) => {
+				setMessages((prev) =>
+					prev.map((msg) => (msg.id === "loading" ? { ...msg, text } : msg)),
+				);
+			};
+
+			// Baca server-sent events: intent, data, token, done, error
+			const reader = response.body.getReader();
+			const decoder = new TextDecoder();
+			let buffer = "";
+			while (true) {
+				const { value, done } = await reader.read();
+				if (done) break;
+				buffer += decoder.decode(value, { stream: true });
+
+				const frames = buffer.split("\n\n");
+				buffer = frames.pop() ?? "";
+				for (const frame of frames) {
+					const event = frame.match(/^event: (.*)$/m)?.[1];
+					const payload = frame.match(/^data: (.*)$/m)?.[1];
+					if (!event || payload === undefined) continue;
+					const data = JSON.parse(payload);
+
+					switch (event) {
+						case "intent":
+							showStatus("Mengambil data...");
+							break;
+						case "data":
+							showStatus("Menganalisis data...");
+							break;
+						case "token":
+							botText += data;
+							showBotText(botText);
+							break;
+						case "done":
+							answered = true;
+							showBotText(data.response);
+							break;
+						case "error":
+							throw new Error(data.detail);
+					}
+				}
+			}
+			if (!answered) {
+				throw new Error("Stream ended before the response was complete");
+			}
 		} catch (error) {
 			console.error("Error sending message:", error);
 
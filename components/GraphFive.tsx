@@ -6,55 +6,98 @@ import { RefreshCw } from "lucide-react";
 interface TableRow {
 	id: number;
 	provinsi: string;
-	kabupaten: string;
-	kecamatan: string;
 	perkiraan_panen_september: number;
 	perkiraan_panen_oktober: number;
-	alsintan_september: number;
 	alsintan_oktober: number;
-	bera: number;
-	penggenangan: number;
 	tanam: number;
-	vegetatif_1: number;
-	vegetatif_2: number;
-	max_vegetatif: number;
-	generatif_1: number;
-	generatif_2: number;
 	panen: number;
-	standing_crop: number;
-	luas_baku_sawah: number;
 }
 
 interface ApiResponse {
 	success: boolean;
 	message: string;
-	data: TableRow[];
+	data: {
+		rows: TableRow[];
+		total: number;
+		next_cursor: number | null;
+	};
 }
 
+// Only the columns shown in the table are requested, one page at a time
+const PAGE_SIZE = 20;
+const TABLE_COLUMNS = [
+	"id",
+	"provinsi",
+	"perkiraan_panen_september",
+	"perkiraan_panen_oktober",
+	"alsintan_oktober",
+	"tanam",
+	"panen",
+].join(",");
+
 function GraphFive() {
 	const [tableData, setTableData] = useState<TableRow[]>([]);
+	const [nextCursor, setNextCursor] = useState<number | null>(null);
 	const [isLoading, setIsLoading] = useState(false);
+	const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+	const fetchPage = async (cursor: number | null) => {
+		const apiUrl =
+			process.env.NEXT_PUBLIC_TOOL_API_URL || "http://10.11.1.207:8011";
+		const params = new URLSearchParams({
+			region: "indonesia",
+			limit: String(PAGE_SIZE),
+			sort: "id",
+			columns: TABLE_COLUMNS,
+		});
+		if (cursor !== null) {
+			params.set("cursor", String(cursor));
+		}
+		const response = await fetch(`${apiUrl}/api/data/panen?${params}`);
+		const result: ApiResponse = await response.json();
+		return result.success && result.data ? result.data : null;
+	};
 
 	const fetchData = async () => {
 		setIsLoading(true);
 		try {
-			const apiUrl =
-				process.env.NEXT_PUBLIC_TOOL_API_URL || "http://10.11.1.207:8011";
-			const response = await fetch(`${apiUrl}/api/charts/general-data`);
-			const result: ApiResponse = await response.json();
-
-			if (result.success && result.data) {
-				setTableData(result.data);
-			}
+			const page = await fetchPage(null);
+			setTableData(page ? page.rows : []);
+			setNextCursor(page ? page.next_cursor : null);
 		} catch (error) {
 			console.error("Error fetching data:", error);
 			// Keep empty data if API fails
 			setTableData([]);
+			setNextCursor(null);
 		} finally {
 			setIsLoading(false);
 		}
 	};
 
+	const fetchMore = async () => {
+		if (nextCursor === null || isLoadingMore) return;
+		setIsLoadingMore(true);
+		try {
+			const page = await fetchPage(nextCursor);
+			if (page) {
+				setTableData((rows) => [...rows, ...page.rows]);
+				setNextCursor(page.next_cursor);
+			}
+		} catch (error) {
+			console.error("Error fetching more data:", error);
+		} finally {
+			setIsLoadingMore(false);
+		}
+	};
+
+	// Load the next page when the table is scrolled near its end
+	const handleScroll = (event: React.UIEvent<HTMLDivElement>) => {
+		const target = event.currentTarget;
+		if (target.scrollTop + target.clientHeight >= target.scrollHeight - 16) {
+			fetchMore();
+		}
+	};
+
 	useEffect(() => {
 		fetchData();
 	}, []);
@@ -126,7 +169,7 @@ function GraphFive() {
 				/>
 			</button>
 
-			<div className="w-full h-full overflow-x-auto">
+			<div className="w-full h-full overflow-auto" onScroll={handleScroll}>
 				{isLoading || tableData.length === 0 ? (
 					<TableSkeleton />
 				) : (
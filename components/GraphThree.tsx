@@ -44,6 +44,15 @@ interface ApiResponse {
 			produksi_beras: number;
 			produksi_padi: number;
 		}>;
+		comparison: Array<{
+			provinsi: string;
+			panen: number;
+			luas_panen: number | null;
+			produksi_padi: number | null;
+			produksi_beras: number | null;
+			selisih_luas_panen: number | null;
+			rasio_luas_panen: number | null;
+		}>;
 	};
 }
 
@@ -75,26 +84,19 @@ export default function LineChart() {
 			const result: ApiResponse = await response.json();
 
 			if (result.success && result.data) {
-				// Get top 10 provinces from harvest data
-				const harvestData = result.data.harvest_data.slice(0, 10);
-				const labels = harvestData.map((item) => item.provinsi);
+				// Top 10 provinces by harvest, already joined with KSA by the API
+				const comparison = result.data.comparison.slice(0, 10);
+				const labels = comparison.map((item) => item.provinsi);
 
 				// Create harvest dataset (convert to thousands for better scale)
-				const harvestValues = harvestData.map((item) =>
+				const harvestValues = comparison.map((item) =>
 					Math.round(item.panen / 1000),
 				);
 
-				// Create KSA dataset by matching provinces and summing produksi_padi (convert to thousands)
-				const ksaValues = labels.map((provinsi) => {
-					const ksaItems = result.data.ksa_data.filter(
-						(item) => item.provinsi === provinsi,
-					);
-					const total = ksaItems.reduce(
-						(sum, item) => sum + item.produksi_padi,
-						0,
-					);
-					return Math.round(total / 1000);
-				});
+				// KSA produksi_padi for the same provinces (convert to thousands)
+				const ksaValues = comparison.map((item) =>
+					Math.round((item.produksi_padi ?? 0) / 1000),
+				);
 
 				setChartData({
 					labels: labels,
@@ -12,6 +12,7 @@ echo "🗄️ Setting up database on VPS..."
 # Upload the database script
 echo "📤 Uploading database insertion script..."
 scp insert_data.py ${SSH_TARGET}:/tmp/
+scp -r ApiDB/migrations ${SSH_TARGET}:/tmp/
 
 # Create Latest folder and upload CSV files if they exist
 if [ -d "Latest" ]; then
@@ -27,8 +28,10 @@ set -e
 echo "🏠 Setting up database environment..."
 cd /home/soc-ai/tani-ai
 
-# Copy database script
+# Copy database script and schema migrations
 cp /tmp/insert_data.py .
+mkdir -p ApiDB
+cp -r /tmp/migrations ApiDB/
 
 # Copy CSV files if they exist
 if [ -d "/tmp/Latest" ]; then
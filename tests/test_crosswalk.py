@@ -0,0 +1,46 @@
+from insert_data import crosswalk_key, match_names
+
+
+def test_crosswalk_key_normalizes_case_spacing_and_punctuation():
+    assert crosswalk_key("  Jawa   Barat ") == crosswalk_key("JAWA BARAT") == "jawabarat"
+    assert crosswalk_key("Fak-fak") == crosswalk_key("Fakfak")
+
+
+def test_crosswalk_key_joins_spaced_letters():
+    assert crosswalk_key("S I A K") == crosswalk_key("Siak")
+    assert crosswalk_key("B A T A M") == "batam"
+
+
+def test_crosswalk_key_expands_abbreviations_and_drops_dan():
+    assert crosswalk_key("Kep. Seribu") == crosswalk_key("Kepulauan Seribu")
+    assert crosswalk_key("Bangka Belitung") == crosswalk_key("Bangka dan Belitung")
+
+
+def test_crosswalk_key_reads_kota_suffix():
+    assert crosswalk_key("Solok (Kota)") == crosswalk_key("Kota Solok")
+
+
+def test_match_names_exact_kota_and_fuzzy_passes():
+    pairs = match_names(
+        ["Jawa Barat", "Batu", "Nagakeo"],
+        ["JAWA BARAT", "Kota Batu", "Nagekeo"],
+    )
+    assert pairs["Jawa Barat"] == ("JAWA BARAT", "exact")
+    assert pairs["Batu"] == ("Kota Batu", "kota")
+    assert pairs["Nagakeo"] == ("Nagekeo", "fuzzy")
+
+
+def test_match_names_prefers_the_spelling_with_most_rows():
+    ksa_names = sorted(["JAWA BARAT", "Jawa Barat"])
+    assert ksa_names[0] == "JAWA BARAT"
+    pairs = match_names(["Jawa Barat"], ksa_names, {"JAWA BARAT": 1, "Jawa Barat": 648})
+    assert pairs["Jawa Barat"] == ("Jawa Barat", "exact")
+
+
+def test_match_names_uses_each_ksa_name_once():
+    pairs = match_names(["Bogor", "Kota Bogor"], ["Bogor", "Kota Bogor"])
+    assert pairs == {"Bogor": ("Bogor", "exact"), "Kota Bogor": ("Kota Bogor", "exact")}
+
+
+def test_match_names_leaves_dissimilar_names_unmatched():
+    assert match_names(["Sleman"], ["Bantul"]) == {}
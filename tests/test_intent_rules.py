@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from intent_rules import IntentClassifier, RegionMatcher
+
+REGIONS = {
+    "provinsi": ["Jawa Barat", "Jawa Timur"],
+    "kota": ["Surabaya"],
+    "kabupaten": ["Bogor", "Bandung"],
+}
+
+
+@pytest.fixture
+def classifier():
+    classifier = IntentClassifier(threshold=0.8)
+    classifier.regions = RegionMatcher(REGIONS)
+    return classifier
+
+
+@pytest.mark.parametrize("message, needs, chart, location, date", [
+    ("jelaskan chart 3", "analyze_chart", 3, None, None),
+    ("jelaskan grafik ke-2", "analyze_chart", 2, None, None),
+    ("tolong jelaskan chart 5 untuk Jawa Timur", "analyze_chart", 5, ["Jawa Timur"], None),
+    ("jelaskan chart 1 bulan Maret 2025", "analyze_chart", 1, None, ["Maret 2025"]),
+    ("data panen Jawa Barat", "analyze_data_panen", None, ["Jawa Barat"], None),
+    ("data panen kota Surabaya", "analyze_data_panen", None, ["kota Surabaya"], None),
+    ("ringkasan data panen kabupaten Bogor", "analyze_data_panen", None, ["kabupaten Bogor"], None),
+])
+def test_score_parses_formulaic_messages(classifier, message, needs, chart, location, date):
+    intent = classifier.score(message)
+    assert intent is not None and intent.confidence >= classifier.threshold
+    assert (intent.needs, intent.chart, intent.location, intent.date) == (needs, chart, location, date)
+
+
+@pytest.mark.parametrize("message", [
+    # Negations would keep the excluded region as a location
+    "jelaskan data panen jawa barat kecuali bogor",
+    "ringkasan panen jawa barat selain bogor",
+    "jelaskan chart 2 jangan jawa barat",
+    "data panen bogor tidak termasuk padi gogo",
+    # Relative dates would be dropped
+    "jelaskan data panen jawa barat tahun lalu",
+    "jelaskan data panen jawa barat bulan lalu",
+    # Questions, comparisons, unknown places and unaccounted words
+    "berapa panen di Jawa Barat?",
+    "kenapa chart 4 turun",
+    "bandingkan chart 1 dan chart 2",
+    "jelaskan data panen di Sukabumi",
+    "jelaskan chart 3 dengan gaya santai",
+    # Neither a chart nor the harvest data
+    "halo apa kabar",
+])
+def test_score_falls_back_below_threshold(classifier, message):
+    intent = classifier.score(message)
+    assert intent is None or intent.confidence < classifier.threshold
+
+
+def test_region_matcher_prefers_the_longest_name():
+    matcher = RegionMatcher({"provinsi": ["Jawa Barat"], "kabupaten": ["Barat"]})
+    assert matcher.find(["panen", "jawa", "barat"]) == [(1, 3)]
+
+
+def test_classify_counts_fast_path_and_fallback(classifier):
+    async def classify_all():
+        return [await classifier.classify(message) for message in ("jelaskan chart 3", "halo apa kabar")]
+
+    fast, fallback = asyncio.run(classify_all())
+    assert fast.chart == 3 and fallback is None
+    assert classifier.stats()["fast_path"] == 1 and classifier.stats()["fallback"] == 1
+    assert classifier.stats()["routes"] == {"analyze_chart": 1}
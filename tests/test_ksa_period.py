@@ -0,0 +1,19 @@
+import pytest
+
+from utils import ksa_period
+
+
+def test_ksa_period_accepts_year_month_forms():
+    assert ksa_period("2025-03") == ksa_period("2025-3") == 2025 * 12 + 2
+
+
+def test_ksa_period_accepts_month_name_and_year():
+    assert ksa_period("Maret 2025") == ksa_period("mar 2025") == ksa_period("2025-03")
+    assert ksa_period("Desember 2024") + 1 == ksa_period("Januari 2025")
+
+
+def test_ksa_period_rejects_unknown_input():
+    with pytest.raises(ValueError):
+        ksa_period("Maret")
+    with pytest.raises(ValueError):
+        ksa_period("2025-13")